@@ -2,6 +2,7 @@ import os
 import time
 import signal
 import sys
+import asyncio
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Optional, Any
@@ -14,7 +15,7 @@ import uvicorn
 
 from core.task_manager import TaskManager
 from core.tool_manager import ToolManager
-from utils.response import ToolResponse, ToolRequest
+from utils.response import ToolResponse, ToolRequest, BatchToolRequest
 from utils.logger import global_logger
 from utils.lock_manager import LockManager
 from utils.human_task_manager import HumanTaskManager
@@ -136,7 +137,18 @@ class ToolServer:
                     execution_time=time.time() - start_time
                 )
                 return error_response
-        
+
+        @self.app.post("/api/tool/execute_batch")
+        async def execute_tool_batch(batch: BatchToolRequest):
+            """批量执行工具：一次请求并发执行多个工具调用，结果按请求顺序返回"""
+            if not self.tool_manager:
+                raise HTTPException(status_code=500, detail="Tool manager not initialized")
+
+            responses = await asyncio.gather(
+                *(execute_tool(request) for request in batch.requests)
+            )
+            return {"success": True, "responses": responses}
+
         @self.app.post("/api/task/create")
         async def create_task(task_id: str, task_name: str, requirements: Optional[str] = None):
             """创建任务"""
@@ -439,7 +451,11 @@ class ToolServer:
         """停止服务器"""
         global_logger.info("Stopping Tool Server...")
         self.is_running = False
-        
+
+        # 把延迟写盘的锁状态同步落盘
+        if self.lock_manager:
+            self.lock_manager.flush_now()
+
         # 关闭工具管理器的资源
         if self.tool_manager and self.tool_manager.proxy_tools_manager:
             import asyncio
@@ -6,7 +6,7 @@ from datetime import datetime
 from typing import Dict, List, Optional
 from pathlib import Path
 
-from utils.logger import TaskLogger, global_logger
+from utils.logger import TaskLogger, get_task_logger, drop_task_logger, global_logger
 
 
 class TaskManager:
@@ -52,7 +52,7 @@ class TaskManager:
             # 如果有requirements，将保存到meta.json中，由Docker容器内的pip_install处理
             
             # 创建任务logger
-            logger = TaskLogger(task_id, str(task_path / "logs"))
+            logger = get_task_logger(task_id, str(task_path / "logs"))
             logger.log_process(f"Task {task_id} created successfully")
             
             # 保存任务信息
@@ -93,8 +93,9 @@ class TaskManager:
             if task_path.exists():
                 shutil.rmtree(task_path)
             
-            # 从内存中删除
+            # 从内存中删除并释放缓存的logger
             del self.tasks[task_id]
+            drop_task_logger(task_id)
             
             global_logger.info(f"Task {task_id} deleted")
             
@@ -117,7 +118,7 @@ class TaskManager:
                     with open(meta_file, 'r') as f:
                         meta_data = json.load(f)
                     
-                    logger = TaskLogger(task_id, str(task_path / "logs"))
+                    logger = get_task_logger(task_id, str(task_path / "logs"))
                     task_info = TaskInfo(
                         task_id=task_id,
                         task_name=meta_data.get('task_name', 'Unknown'),
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from utils.response import ToolResponse
 from pathlib import Path
 
@@ -11,6 +11,7 @@ class BaseTool(ABC):
         self.tool_name = self.__class__.__name__.lower().replace('tool', '')
         self.description = ""
         self.version = "1.0.0"
+        self._task_path_cache: Dict[Any, Path] = {}
     
     @abstractmethod
     async def execute(self, task_id: str, **params) -> ToolResponse:
@@ -27,8 +28,15 @@ class BaseTool(ABC):
         pass
     
     def get_task_path(self, task_id: str, workspace_path: Path) -> Path:
-        """获取任务路径"""
-        return workspace_path / "tasks" / task_id
+        """获取任务路径（结果按(workspace, task_id)缓存，免去重复join）"""
+        key = (str(workspace_path), task_id)
+        cached = self._task_path_cache.get(key)
+        if cached is None:
+            cached = workspace_path / "tasks" / task_id
+            if len(self._task_path_cache) >= 1024:
+                self._task_path_cache.clear()
+            self._task_path_cache[key] = cached
+        return cached
     
     def get_tool_info(self) -> Dict[str, Any]:
         """获取工具信息"""
@@ -42,10 +50,41 @@ class BaseTool(ABC):
 
 class LocalTool(BaseTool):
     """本地工具基类"""
-    
+
+    # 缓存上限：超过即整体清空，防止长生命周期进程无界增长
+    _CACHE_LIMIT = 1024
+
     def __init__(self):
         super().__init__()
         self.tool_type = "local"
+        # 热循环里同一(task_id, 相对路径)会被反复拼接，缓存拼接结果
+        self._path_cache: Dict[Tuple[str, str], Path] = {}
+        # 已确认存在的目录，短路重复的mkdir(parents=True)
+        self._mkdir_cache: set = set()
+
+    def _resolve(self, task_id: str, workspace_path: Path, rel: str) -> Path:
+        """拼接任务内路径并缓存，省掉重复的PurePath运算分配"""
+        key = (task_id, rel)
+        cached = self._path_cache.get(key)
+        if cached is None:
+            cached = self.get_task_path(task_id, workspace_path) / rel
+            if len(self._path_cache) >= self._CACHE_LIMIT:
+                self._path_cache.clear()
+            self._path_cache[key] = cached
+        return cached
+
+    def _ensure_dir(self, dir_path: Path):
+        """mkdir(parents=True, exist_ok=True)，本实例建过的目录直接返回"""
+        if dir_path in self._mkdir_cache:
+            return
+        dir_path.mkdir(parents=True, exist_ok=True)
+        if len(self._mkdir_cache) >= self._CACHE_LIMIT:
+            self._mkdir_cache.clear()
+        self._mkdir_cache.add(dir_path)
+
+    def _forget_dir(self, dir_path: Path):
+        """目录可能被外部删除时清掉对应缓存项，供写入失败重试用"""
+        self._mkdir_cache.discard(dir_path)
 
 
 class RemoteTool(BaseTool):
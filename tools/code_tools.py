@@ -1,15 +1,27 @@
+import os
+import re
 import sys
 import asyncio
+import hashlib
 import subprocess
+import shlex
 import shutil
 import git
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 from .base_tool import LocalTool
 from utils.response import ToolResponse
 from utils.logger import global_logger
 from utils.lock_decorator import require_read_access, require_write_access
 
+# 词数统计用的正则，模块级编译一次；finditer在C层扫描，
+# 避免content.split()一次性构建整个词列表
+_WORD_RE = re.compile(r"\S+")
+
+# shell元字符检测：命中任意一个则命令需要真正的shell解释，
+# 否则可以shlex.split后直接exec，省掉/bin/sh -c这层fork+exec
+_SHELL_META = re.compile(r"[|&;<>()$`\\\"'*?\[\]{}#~!\n]")
+
 
 class ExecuteCodeTool(LocalTool):
     """Python代码执行工具"""
@@ -79,81 +91,232 @@ class ExecuteCodeTool(LocalTool):
 
 
 class ExecuteShellTool(LocalTool):
-    """Shell命令执行工具"""
-    
+    """Shell命令执行工具 - 每个任务复用常驻shell，避免每条命令fork+exec"""
+
+    # 输出分隔标记，用于在常驻shell的输出流中界定单条命令的结束
+    _SENTINEL = b"\x1eEND\x1e"
+
     def __init__(self):
         super().__init__()
         self.tool_name = "execute_shell"
         self.description = "执行Shell命令"
-    
-    async def execute(self, task_id: str, workspace_path: Path, command: str, timeout: int = 60, workdir: str = '', **kwargs) -> ToolResponse:
+        # 每个task_id对应一个常驻bash进程
+        self._shells: Dict[str, asyncio.subprocess.Process] = {}
+        # 同一任务的并发调用串行化：两个协程交错读写同一个bash的
+        # 管道会打乱sentinel帧
+        self._shell_locks: Dict[str, asyncio.Lock] = {}
+
+    async def _get_shell(self, task_id: str) -> asyncio.subprocess.Process:
+        """获取任务的常驻shell，不存在或已退出时重新创建"""
+        process = self._shells.get(task_id)
+        if process is not None and process.returncode is None:
+            return process
+
+        process = await asyncio.create_subprocess_exec(
+            "bash", "--noprofile", "--norc", "-s",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        self._shells[task_id] = process
+        return process
+
+    def _discard_shell(self, task_id: str):
+        """回收任务的常驻shell（超时/异常后不再复用）"""
+        process = self._shells.pop(task_id, None)
+        if process is not None and process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+
+    async def execute(self, task_id: str, workspace_path: Path, command: str, timeout: int = 60, workdir: str = '', reuse_shell: bool = True, **kwargs) -> ToolResponse:
         try:
             if not command:
                 return ToolResponse(success=False, error="command is required")
-            
+
             task_path = self.get_task_path(task_id, workspace_path)
             if workdir:
                 work_path = task_path / workdir
             else:
                 work_path = task_path / "code_run"
-            
+
             work_path.mkdir(parents=True, exist_ok=True)
-            
+
+            if reuse_shell:
+                shell_lock = self._shell_locks.setdefault(task_id, asyncio.Lock())
+                async with shell_lock:
+                    return await self._execute_persistent(task_id, command, timeout, work_path)
+            return await self._execute_spawn(command, timeout, work_path)
+
+        except Exception as e:
+            return ToolResponse(success=False, error=str(e))
+
+    async def _execute_persistent(self, task_id: str, command: str, timeout: int, work_path: Path) -> ToolResponse:
+        """在常驻shell中执行命令，通过sentinel标记界定输出"""
+        process = await self._get_shell(task_id)
+
+        # 每条命令前先cd到工作目录，命令结束后向stdout/stderr各写一条sentinel
+        framed = (
+            f"cd {shlex.quote(str(work_path))}\n"
+            f"{command}\n"
+            f"printf '\\x1eEND\\x1e%d\\n' $?\n"
+            f"printf '\\x1eEND\\x1e\\n' >&2\n"
+        )
+
+        async def _read_until_sentinel(stream):
+            """按块读取直到遇到sentinel，返回(输出, sentinel行)。
+
+            不用readline：单行超过StreamReader默认64KB上限会抛
+            LimitOverrunError，而此时命令已在shell中执行，不能重放。"""
+            buf = b''
+            search_from = 0
+            while True:
+                idx = buf.find(self._SENTINEL, search_from)
+                if idx != -1:
+                    # 把sentinel所在行补读完整（stdout的sentinel后跟退出码）
+                    end = buf.find(b'\n', idx)
+                    while end == -1:
+                        chunk = await stream.read(65536)
+                        if not chunk:
+                            return buf[:idx], buf[idx:]
+                        buf += chunk
+                        end = buf.find(b'\n', idx)
+                    return buf[:idx], buf[idx:end + 1]
+                # sentinel可能跨块边界，回退其长度后继续搜索
+                search_from = max(0, len(buf) - len(self._SENTINEL) + 1)
+                chunk = await stream.read(65536)
+                if not chunk:
+                    # shell已退出（如命令中包含exit）
+                    return buf, None
+                buf += chunk
+
+        try:
+            process.stdin.write(framed.encode('utf-8'))
+            await process.stdin.drain()
+        except Exception:
+            # 写入失败说明shell管道已坏、命令未送达，可安全退回spawn路径
+            self._discard_shell(task_id)
+            return await self._execute_spawn(command, timeout, work_path)
+
+        try:
+            (stdout, out_tail), (stderr, _) = await asyncio.wait_for(
+                asyncio.gather(
+                    _read_until_sentinel(process.stdout),
+                    _read_until_sentinel(process.stderr)
+                ),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            # 超时后shell状态不可信，回收进程
+            self._discard_shell(task_id)
+            return ToolResponse(
+                success=False,
+                error=f"Command timeout after {timeout} seconds"
+            )
+        except Exception as e:
+            # 命令已写入shell、副作用可能已发生，不能退回spawn重放；
+            # 回收shell并如实报错
+            self._discard_shell(task_id)
+            return ToolResponse(
+                success=False,
+                error=f"Persistent shell read failed: {e}"
+            )
+
+        if out_tail is not None:
             try:
+                exit_code = int(out_tail[len(self._SENTINEL):].strip())
+            except ValueError:
+                self._discard_shell(task_id)
+                exit_code = -1
+        else:
+            # shell本身退出了，以shell退出码为准，下次调用重新创建
+            await process.wait()
+            self._discard_shell(task_id)
+            exit_code = process.returncode
+
+        return ToolResponse(
+            success=True,
+            data={
+                "exit_code": exit_code,
+                "stdout": stdout.decode('utf-8') if stdout else "",
+                "stderr": stderr.decode('utf-8') if stderr else "",
+                "command": command
+            }
+        )
+
+    async def _execute_spawn(self, command: str, timeout: int, work_path: Path) -> ToolResponse:
+        """一次性spawn执行命令（reuse_shell=False或常驻shell异常时的回退路径）"""
+        try:
+            # 简单命令（无shell元字符）直接exec，省掉/bin/sh -c中间层
+            argv = None
+            if not _SHELL_META.search(command):
+                try:
+                    argv = shlex.split(command)
+                except ValueError:
+                    argv = None
+
+            if argv:
+                process = await asyncio.create_subprocess_exec(
+                    *argv,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=str(work_path)
+                )
+            else:
                 process = await asyncio.create_subprocess_shell(
                     command,
                     stdout=asyncio.subprocess.PIPE,
                     stderr=asyncio.subprocess.PIPE,
                     cwd=str(work_path)
                 )
-                
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(), 
-                    timeout=timeout
-                )
-                
-                return ToolResponse(
-                    success=True,
-                    data={
-                        "exit_code": process.returncode,
-                        "stdout": stdout.decode('utf-8') if stdout else "",
-                        "stderr": stderr.decode('utf-8') if stderr else "",
-                        "command": command
-                    }
-                )
-                
-            except asyncio.TimeoutError:
-                try:
-                    process.kill()
-                    await process.wait()
-                except:
-                    pass
-                return ToolResponse(
-                    success=False,
-                    error=f"Command timeout after {timeout} seconds"
-                )
-                
-        except Exception as e:
-            return ToolResponse(success=False, error=str(e))
+
+            stdout, stderr = await asyncio.wait_for(
+                process.communicate(),
+                timeout=timeout
+            )
+
+            return ToolResponse(
+                success=True,
+                data={
+                    "exit_code": process.returncode,
+                    "stdout": stdout.decode('utf-8') if stdout else "",
+                    "stderr": stderr.decode('utf-8') if stderr else "",
+                    "command": command
+                }
+            )
+
+        except asyncio.TimeoutError:
+            try:
+                process.kill()
+                await process.wait()
+            except:
+                pass
+            return ToolResponse(
+                success=False,
+                error=f"Command timeout after {timeout} seconds"
+            )
 
 
 class PipInstallTool(LocalTool):
     """Python包安装工具"""
-    
+
     def __init__(self):
         super().__init__()
         self.tool_name = "pip_install"
         self.description = "在虚拟环境中安装Python包"
-    
+
     async def execute(self, task_id: str, workspace_path: Path, packages: List[str] = None, **kwargs) -> ToolResponse:
         try:
             if not packages:
                 return ToolResponse(success=False, error="packages is required")
-            
+
             task_path = self.get_task_path(task_id, workspace_path)
             pip_path = task_path / "code_env" / "bin" / "pip"
-            
-            # 如果虚拟环境不存在，创建它
+
+            # 如果虚拟环境不存在，创建它。就绪状态每次都以stat核实：
+            # 按task_id缓存会在任务删除重建后残留陈旧条目，而一次stat
+            # 相比pip本身的开销可以忽略
             if not pip_path.exists():
                 venv_path = task_path / "code_env"
                 if venv_path.exists():
@@ -177,34 +340,40 @@ class PipInstallTool(LocalTool):
                         success=False,
                         error=f"pip not found after creating virtual environment: {pip_path}"
                     )
-            
+
             # 安装包
             if isinstance(packages, str):
                 packages = [packages]
-            
-            results = []
-            for package in packages:
-                process = await asyncio.create_subprocess_exec(
-                    str(pip_path), "install", package,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                stdout, stderr = await process.communicate()
-                
-                results.append({
-                    "package": package,
-                    "success": process.returncode == 0,
+
+            # 跨任务共享wheel缓存，并跳过pip自身的版本检查/交互提示
+            pip_env = {
+                **os.environ,
+                "PIP_CACHE_DIR": str(workspace_path / ".pip-cache"),
+                "PIP_DISABLE_PIP_VERSION_CHECK": "1",
+                "PIP_NO_INPUT": "1"
+            }
+
+            # 整个包列表交给一次pip调用：pip自己统一解析依赖并并行下载；
+            # 多个pip进程并发写同一venv没有环境级锁，会竞争site-packages
+            process = await asyncio.create_subprocess_exec(
+                str(pip_path), "install", "--prefer-binary", *packages,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=pip_env
+            )
+            stdout, stderr = await process.communicate()
+            success = process.returncode == 0
+
+            return ToolResponse(
+                success=success,
+                data={
+                    "packages": packages,
+                    "exit_code": process.returncode,
                     "stdout": stdout.decode('utf-8') if stdout else "",
                     "stderr": stderr.decode('utf-8') if stderr else ""
-                })
-            
-            all_success = all(r["success"] for r in results)
-            
-            return ToolResponse(
-                success=all_success,
-                data={"results": results}
+                }
             )
-            
+
         except Exception as e:
             return ToolResponse(success=False, error=str(e))
 
@@ -305,14 +474,19 @@ class GitCloneTool(LocalTool):
 
 class ParseDocumentTool(LocalTool):
     """文档解析工具"""
-    
+
+    # 超过该字符数的解析结果写入文件按引用返回，避免大文档在响应管线中反复拷贝/序列化
+    INLINE_CONTENT_LIMIT = 64 * 1024
+    # 按引用返回时附带的内容预览长度
+    PREVIEW_CHARS = 4096
+
     def __init__(self):
         super().__init__()
         self.tool_name = "parse_document"
         self.description = "解析文档（PDF、Word、PPT、Markdown）"
-    
+
     @require_read_access('file_path')
-    async def execute(self, task_id: str, workspace_path: Path, file_path: str, **kwargs) -> ToolResponse:
+    async def execute(self, task_id: str, workspace_path: Path, file_path: str, inline: bool = False, **kwargs) -> ToolResponse:
         try:
             if not file_path:
                 return ToolResponse(success=False, error="file_path is required")
@@ -372,16 +546,28 @@ class ParseDocumentTool(LocalTool):
                         error=f"Unsupported file type: {ext}"
                     )
                 
-                return ToolResponse(
-                    success=True,
-                    data={
-                        "content": content,
-                        "metadata": metadata,
-                        "file_path": file_path,
-                        "char_count": len(content),
-                        "word_count": len(content.split())
-                    }
-                )
+                result_data = {
+                    "metadata": metadata,
+                    "file_path": file_path,
+                    "char_count": len(content),
+                    "word_count": sum(1 for _ in _WORD_RE.finditer(content))
+                }
+
+                if inline or len(content) <= self.INLINE_CONTENT_LIMIT:
+                    result_data["content"] = content
+                else:
+                    # 大文档写入parsed目录，响应只携带路径和预览
+                    content_hash = hashlib.blake2b(
+                        content.encode('utf-8'), digest_size=16
+                    ).hexdigest()
+                    parsed_dir = task_path / "parsed"
+                    parsed_dir.mkdir(parents=True, exist_ok=True)
+                    content_file = parsed_dir / f"{content_hash}.txt"
+                    content_file.write_text(content, encoding='utf-8')
+                    result_data["content_path"] = str(content_file.relative_to(task_path))
+                    result_data["preview"] = content[:self.PREVIEW_CHARS]
+
+                return ToolResponse(success=True, data=result_data)
                 
             except Exception as e:
                 return ToolResponse(
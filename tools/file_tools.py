@@ -1,7 +1,16 @@
 import os
-import base64
+import re
+import stat
+import mmap
+import errno
+import codecs
 import shutil
+import asyncio
+import bisect
 import chardet
+import threading
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple
 from .base_tool import LocalTool
@@ -9,28 +18,282 @@ from utils.response import ToolResponse
 from datetime import datetime
 from utils.lock_decorator import require_write_access, require_read_access, bypass_lock_check
 
+# 编码探测优先用C实现的cchardet（比纯Python的chardet快20-200倍），
+# 其次charset_normalizer，两者都未安装时回退chardet
+try:
+    import cchardet as _cchardet
+except ImportError:
+    _cchardet = None
+try:
+    from charset_normalizer import from_bytes as _cn_from_bytes
+except ImportError:
+    _cn_from_bytes = None
+
+# 优先使用pybase64（SIMD加速，解码速度约为标准库20倍），未安装时回退
+# binascii.a2b_base64——base64.b64decode的C层内核，跳过其包装层；
+# b64decode_as_bytearray直接产出可写缓冲，省掉一次bytes中转拷贝
+try:
+    from pybase64 import b64decode, b64decode_as_bytearray
+except ImportError:
+    from binascii import a2b_base64 as b64decode
+    b64decode_as_bytearray = b64decode
+
+# 禁止按文本读取的二进制后缀，模块级构建一次
+_BINARY_EXTS = frozenset({
+    '.pdf', '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.ico', '.tiff', '.webp',
+    '.mp3', '.mp4', '.avi', '.mov', '.wav', '.zip', '.rar', '.7z', '.tar', '.gz',
+    '.exe', '.dll', '.so', '.dylib', '.bin', '.dat', '.db', '.sqlite', '.pkl'
+})
+
+# base64负载超过该大小改为分块解码边写盘，不同时持有编码串和整段解码结果
+_B64_STREAM_THRESHOLD = 16 * 1024 * 1024
+_B64_STREAM_CHUNK = 4 * 1024 * 1024  # 4字节对齐，保证每块都是完整编码组
+
+# 换行偏移表扫描用，模块级编译一次
+_NEWLINE_RE = re.compile('\n')
+_NEWLINE_BYTES_RE = re.compile(b'\n')
+
+# CJK统一表意文字区间，编码探测的置信度修正用；
+# regex在C层按unicode区间表扫描并在首个命中处短路
+_CJK_RE = re.compile(r'[\u4e00-\u9fff]')
+
+# 整读大文件时的缓冲区大小；默认的st_blksize（通常4KiB）对上百KiB的
+# 代码文件来说read(2)次数过多。小文件仍用默认值避免白占内存
+_READ_BUFFER_SIZE = 128 * 1024
+_READ_BUFFER_THRESHOLD = 64 * 1024
+
+
+def _read_buffering(file_size: int) -> int:
+    """按文件大小选择open的buffering参数"""
+    return _READ_BUFFER_SIZE if file_size > _READ_BUFFER_THRESHOLD else -1
+
+
+# 超过该大小的整读改用mmap：直接映射页缓存，省掉read(2)的整份bytes拷贝
+_MMAP_THRESHOLD = 1 << 20
+
+# 超过该大小的顺序读在读前给SEQUENTIAL预取提示、读后主动让出页缓存，
+# 避免扫描型工作负载把共享worker上更热的数据挤出去
+_FADVISE_THRESHOLD = 128 * 1024 * 1024
+
+
+def _read_bytes_fadvise(file_path: Path, file_size: int) -> bytes:
+    """整读文件字节；大文件附带posix_fadvise顺序预取/用后丢弃提示"""
+    if file_size <= _FADVISE_THRESHOLD or not hasattr(os, 'posix_fadvise'):
+        with open(file_path, 'rb') as f:
+            return f.read()
+
+    fd = os.open(file_path, os.O_RDONLY | os.O_CLOEXEC)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        chunks = []
+        while True:
+            chunk = os.read(fd, 8 * 1024 * 1024)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        return b''.join(chunks)
+    finally:
+        os.close(fd)
+
+
+def _stat_path(path: Path, follow_symlinks: bool = True) -> Optional[os.stat_result]:
+    """一次stat拿到存在性/类型/大小，替代exists()+is_file()+stat()三连syscall"""
+    try:
+        return os.stat(path, follow_symlinks=follow_symlinks)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+# file_read内容缓存：agent循环里同一份源码会被反复读取，
+# key含mtime_ns/size，文件一旦变化自动失效；命中时省掉read+解码
+_READ_CACHE: OrderedDict = OrderedDict()
+_READ_CACHE_LOCK = threading.Lock()
+_READ_CACHE_MAX_ENTRIES = 64
+_READ_CACHE_MAX_CHARS = 64 * 1024 * 1024
+_read_cache_chars = 0
+
+
+# 并行删除的启用门槛：小目录线程池的启动成本盖过收益，直接走rmtree
+_RMTREE_PARALLEL_THRESHOLD = 128
+
+
+def _copy_file_fast(src: Path, dest: Path):
+    """单文件复制：优先os.copy_file_range在内核内搬运（reflink文件系统上
+    可零拷贝），不可用时回退shutil.copyfile+copystat。
+
+    copyfile在Linux上走sendfile，仍免去64KB用户态缓冲循环。
+    """
+    copy_range = getattr(os, 'copy_file_range', None)
+    if copy_range is not None:
+        fd_src = os.open(src, os.O_RDONLY | os.O_CLOEXEC)
+        try:
+            fd_dst = os.open(dest, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o644)
+            try:
+                remaining = os.fstat(fd_src).st_size
+                if remaining > _FADVISE_THRESHOLD and hasattr(os, 'posix_fadvise'):
+                    os.posix_fadvise(fd_src, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                while remaining > 0:
+                    copied = copy_range(fd_src, fd_dst, remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                if remaining == 0:
+                    shutil.copystat(src, dest)
+                    return
+            except OSError:
+                # 跨文件系统等场景内核拒绝copy_file_range，走通用路径
+                pass
+            finally:
+                os.close(fd_dst)
+        finally:
+            os.close(fd_src)
+
+    shutil.copyfile(src, dest)
+    shutil.copystat(src, dest)
+
+
+def _parallel_rmtree(path: Path):
+    """删除目录树：unlink分发到线程池并行执行，目录按后序rmdir。
+
+    shutil.rmtree逐个串行unlink，在node_modules这类多文件目录上很慢；
+    先一次scandir遍历收集全部文件和目录，再并行删文件、逆序删目录。
+    """
+    # 与shutil.rmtree一致：拒绝对符号链接递归删除，防止跟进链接目标
+    if os.path.islink(path):
+        raise OSError(f"Cannot call _parallel_rmtree on a symbolic link: {path}")
+
+    files: List[str] = []
+    dirs: List[str] = [str(path)]
+    stack = [str(path)]
+
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(entry.path)
+                    stack.append(entry.path)
+                else:
+                    files.append(entry.path)
+
+    if len(files) + len(dirs) <= _RMTREE_PARALLEL_THRESHOLD:
+        shutil.rmtree(path)
+        return
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for _ in pool.map(os.unlink, files, chunksize=64):
+            pass
+
+    # 子目录此时已清空，逆收集序即后序，保证先删深层目录
+    for dir_path in reversed(dirs):
+        os.rmdir(dir_path)
+
+
+def _read_cache_get(key) -> Optional[Tuple[str, str]]:
+    """查询缓存，命中时移动到LRU队尾"""
+    with _READ_CACHE_LOCK:
+        item = _READ_CACHE.get(key)
+        if item is not None:
+            _READ_CACHE.move_to_end(key)
+        return item
+
+
+def _read_cache_put(key, content: str, encoding: str):
+    """写入缓存并按条数/总字符量做LRU淘汰"""
+    global _read_cache_chars
+    if len(content) > _READ_CACHE_MAX_CHARS:
+        return
+    with _READ_CACHE_LOCK:
+        if key in _READ_CACHE:
+            return
+        _READ_CACHE[key] = (content, encoding)
+        _read_cache_chars += len(content)
+        while (len(_READ_CACHE) > _READ_CACHE_MAX_ENTRIES
+               or _read_cache_chars > _READ_CACHE_MAX_CHARS):
+            _, (evicted, _) = _READ_CACHE.popitem(last=False)
+            _read_cache_chars -= len(evicted)
+
+
+def _detect_raw(raw_data: bytes) -> Tuple[Optional[str], float]:
+    """对字节样本跑一次编码探测，cchardet→charset_normalizer→chardet逐级回退"""
+    if _cchardet is not None:
+        result = _cchardet.detect(raw_data)
+        return result.get('encoding'), result.get('confidence') or 0.0
+    if _cn_from_bytes is not None:
+        best = _cn_from_bytes(raw_data).best()
+        if best is None:
+            return None, 0.0
+        return best.encoding, 1.0 - best.chaos
+    result = chardet.detect(raw_data)
+    return result.get('encoding'), result.get('confidence') or 0.0
+
+
+# 探测结果缓存：read→replace→search常对同一文件连续探测，
+# key含mtime_ns/size，写入工具改动文件后自动失效，无需显式清理
+_ENCODING_CACHE: OrderedDict = OrderedDict()
+_ENCODING_CACHE_LOCK = threading.Lock()
+_ENCODING_CACHE_MAX = 4096
+
 
 def detect_file_encoding(file_path: Path) -> Tuple[str, float]:
     """
-    检测文件编码格式
+    检测文件编码格式（结果按(路径, mtime, size)缓存）
     Returns: (encoding, confidence)
     """
     try:
-        with open(file_path, 'rb') as f:
-            raw_data = f.read(10240)  # 读取前10KB用于检测
-        
-        result = chardet.detect(raw_data)
-        encoding = result.get('encoding', 'utf-8')
-        confidence = result.get('confidence', 0.0)
-        
+        st = os.stat(file_path)
+    except OSError:
+        return 'utf-8', 0.0
+
+    key = (str(file_path), st.st_mtime_ns, st.st_size)
+    with _ENCODING_CACHE_LOCK:
+        hit = _ENCODING_CACHE.get(key)
+        if hit is not None:
+            _ENCODING_CACHE.move_to_end(key)
+            return hit
+
+    result = _detect_file_encoding_uncached(file_path)
+
+    with _ENCODING_CACHE_LOCK:
+        _ENCODING_CACHE[key] = result
+        while len(_ENCODING_CACHE) > _ENCODING_CACHE_MAX:
+            _ENCODING_CACHE.popitem(last=False)
+
+    return result
+
+
+def _detect_file_encoding_uncached(file_path: Path) -> Tuple[str, float]:
+    """实际执行一次编码探测（fd采样+快路径+统计探测）"""
+    try:
+        # 样本只有10KB，fd级读取跳过BufferedReader包装
+        fd = os.open(file_path, os.O_RDONLY | os.O_CLOEXEC)
+        try:
+            raw_data = os.read(fd, 10240)
+        finally:
+            os.close(fd)
+
+        # 绝大多数源码文件是纯ASCII/utf-8：isascii是C层按字宽扫高位，
+        # utf-8试解码也在C层完成，两条快路径都命中不了才进统计探测
+        if raw_data.isascii():
+            return 'ascii', 1.0
+        try:
+            raw_data.decode('utf-8')
+            return 'utf-8', 1.0
+        except UnicodeDecodeError as e:
+            # 10KB采样可能恰好切断一个多字节序列，截尾处的错误不算失败
+            if e.start >= len(raw_data) - 3:
+                return 'utf-8', 1.0
+
+        encoding, confidence = _detect_raw(raw_data)
+
         # 对常见的中文编码进行优化判断
         if encoding and encoding.lower() in ['gb2312', 'gbk', 'gb18030']:
             # 尝试用检测到的编码解码，如果成功且包含中文字符，则确认
             try:
                 with open(file_path, 'r', encoding=encoding) as f:
                     test_content = f.read(1024)
-                # 检查是否包含中文字符
-                if any('\u4e00' <= char <= '\u9fff' for char in test_content):
+                # 检查是否包含中文字符（regex在首个命中处短路，免去逐字符生成器）
+                if _CJK_RE.search(test_content):
                     return encoding, min(confidence + 0.1, 1.0)  # 提高中文编码的置信度
             except (UnicodeDecodeError, UnicodeError):
                 pass
@@ -46,42 +309,129 @@ def read_file_with_encoding(file_path: Path, preferred_encoding: Optional[str] =
     使用自动编码检测读取文件
     Returns: (content, actual_encoding)
     """
-    encodings_to_try = []
-    
-    # 如果指定了首选编码，先尝试
-    if preferred_encoding:
-        encodings_to_try.append(preferred_encoding)
-    
-    # 自动检测编码
-    detected_encoding, confidence = detect_file_encoding(file_path)
-    if detected_encoding and detected_encoding not in encodings_to_try:
-        encodings_to_try.append(detected_encoding)
-    
-    # 常见的中文编码回退列表
-    fallback_encodings = ['utf-8', 'gbk', 'gb2312', 'gb18030', 'big5', 'utf-16', 'latin1']
-    for enc in fallback_encodings:
-        if enc not in encodings_to_try:
-            encodings_to_try.append(enc)
-    
-    # 尝试各种编码
-    for encoding in encodings_to_try:
-        try:
-            with open(file_path, 'r', encoding=encoding) as f:
-                content = f.read()
-            return content, encoding
-        except (UnicodeDecodeError, UnicodeError, LookupError):
-            continue
-    
-    # 如果所有编码都失败，使用二进制模式读取并尝试解码
+    # 原始字节只读盘一次，各候选编码直接对内存buffer做decode；
+    # 此前每换一个编码都重新open+read，最坏情况把文件读8遍。
+    # 大文件用mmap零拷贝映射页缓存，免去整份bytes中转分配
+    mm = None
     try:
-        with open(file_path, 'rb') as f:
-            raw_data = f.read()
-        # 尝试用utf-8解码，忽略错误
-        content = raw_data.decode('utf-8', errors='replace')
-        return content, 'utf-8 (with errors replaced)'
-    except Exception as e:
+        st_size = os.stat(file_path).st_size
+        if st_size > _MMAP_THRESHOLD:
+            try:
+                with open(file_path, 'rb') as f:
+                    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                mm = None
+        raw_data = mm if mm is not None else _read_bytes_fadvise(file_path, st_size)
+    except OSError as e:
         raise Exception(f"无法读取文件，所有编码尝试都失败: {str(e)}")
 
+    try:
+        # 调用方显式指定了编码就直接用它解码，成功则完全不跑编码探测；
+        # 失败（指定错了）再进探测+回退流程
+        if preferred_encoding:
+            try:
+                return codecs.decode(raw_data, preferred_encoding), preferred_encoding
+            except (UnicodeDecodeError, UnicodeError, LookupError):
+                pass
+
+        encodings_to_try = []
+
+        # 自动检测编码
+        detected_encoding, confidence = detect_file_encoding(file_path)
+        if detected_encoding:
+            encodings_to_try.append(detected_encoding)
+
+        # 常见的中文编码回退列表（探测命中时循环首轮即返回，不会走到）
+        fallback_encodings = ['utf-8', 'gbk', 'gb2312', 'gb18030', 'big5', 'utf-16', 'latin1']
+        for enc in fallback_encodings:
+            if enc not in encodings_to_try:
+                encodings_to_try.append(enc)
+
+        for encoding in encodings_to_try:
+            try:
+                return codecs.decode(raw_data, encoding), encoding
+            except (UnicodeDecodeError, UnicodeError, LookupError):
+                continue
+
+        # 如果所有编码都失败，用utf-8替换错误字符兜底
+        return codecs.decode(raw_data, 'utf-8', 'replace'), 'utf-8 (with errors replaced)'
+    finally:
+        if mm is not None:
+            mm.close()
+
+
+def _fast_decode(buf: bytes) -> Tuple[str, str]:
+    """ascii→utf-8两级直解码，返回(content, encoding)。
+
+    整段bytes一次C层decode，跳过TextIOWrapper的增量解码器和chardet探测；
+    CPython对纯ASCII有单字节快路径。两者都失败时抛UnicodeDecodeError，
+    由调用方回退到多编码尝试。
+    """
+    try:
+        return buf.decode('ascii'), 'ascii'
+    except UnicodeDecodeError:
+        return buf.decode('utf-8'), 'utf-8'
+
+
+def _write_text_file(file_path: Path, content, mode: str, encoding: str):
+    """同步写入文本内容（str或行列表），供线程池调用"""
+    with open(file_path, mode, encoding=encoding) as f:
+        if isinstance(content, str):
+            f.write(content)
+        else:
+            f.writelines(content)
+
+
+def _write_whole_file(file_path: Path, content: str, encoding: str):
+    """整文件覆盖写：编码后一次write_bytes，跳过BufferedWriter分配和拷贝"""
+    file_path.write_bytes(content.encode(encoding))
+
+
+def _splice_byte_lines(raw: bytes, start_line: int, end_line: int, new_content: str) -> Tuple[bytes, int, int]:
+    """字节级行替换：定位行范围的字节偏移后一次切片拼接。
+
+    不逐行物化str对象，适用于utf-8/ascii文件。
+    Returns: (替换后内容, 新行数, 替换后总行数)
+    Raises: ValueError 行号越界
+    """
+    total_lines = raw.count(b'\n')
+    if raw and not raw.endswith(b'\n'):
+        total_lines += 1
+
+    start_idx = start_line - 1
+    end_idx = end_line
+
+    if start_idx < 0 or start_idx >= total_lines:
+        raise ValueError(f"Invalid start line: {start_line}")
+
+    if end_idx < start_idx or end_idx > total_lines:
+        raise ValueError(f"Invalid end line: {end_line}")
+
+    def offset_after(n: int) -> int:
+        """第n个换行符之后的字节偏移"""
+        pos = 0
+        for _ in range(n):
+            i = raw.find(b'\n', pos)
+            if i == -1:
+                return len(raw)
+            pos = i + 1
+        return pos
+
+    start_off = offset_after(start_idx)
+    end_off = offset_after(end_idx)
+
+    new_bytes = new_content.encode('utf-8')
+    if new_bytes and not new_bytes.endswith(b'\n'):
+        new_bytes += b'\n'
+
+    result = raw[:start_off] + new_bytes + raw[end_off:]
+
+    result_lines = result.count(b'\n')
+    if result and not result.endswith(b'\n'):
+        result_lines += 1
+
+    return result, new_bytes.count(b'\n'), result_lines
+
 
 class FileUploadTool(LocalTool):
     """文件上传工具"""
@@ -102,36 +452,14 @@ class FileUploadTool(LocalTool):
                 upload_dir = task_path / target_path
             else:
                 upload_dir = task_path / "upload"
-            upload_dir.mkdir(parents=True, exist_ok=True)
-            
-            uploaded_files = []
-            
-            for file_data in files:
-                filename = file_data.get('filename')
-                content = file_data.get('content')
-                
-                if not filename or content is None:
-                    continue
-                
-                file_path = upload_dir / filename
-                file_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                if file_data.get('is_base64', False):
-                    content = base64.b64decode(content)
-                    with open(file_path, 'wb') as f:
-                        f.write(content)
-                else:
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        f.write(content)
-                
-                file_stat = os.stat(file_path)
-                uploaded_files.append({
-                    'filename': filename,
-                    'path': str(file_path),
-                    'size': file_stat.st_size,
-                    'created_at': datetime.fromtimestamp(file_stat.st_ctime).isoformat()
-                })
-            
+            self._ensure_dir(upload_dir)
+
+            # base64解码+写盘是阻塞操作，放到线程池中并发执行，避免卡住事件循环
+            results = await asyncio.gather(
+                *(asyncio.to_thread(self._write_one, file_data, upload_dir) for file_data in files)
+            )
+            uploaded_files = [r for r in results if r is not None]
+
             return ToolResponse(
                 success=True,
                 data={
@@ -142,6 +470,64 @@ class FileUploadTool(LocalTool):
         except Exception as e:
             return ToolResponse(success=False, error=str(e))
 
+    def _write_one(self, file_data: Dict, upload_dir: Path) -> Optional[Dict]:
+        """写入单个上传文件（同步，在线程池中执行）"""
+        filename = file_data.get('filename')
+        content = file_data.get('content')
+
+        if not filename or content is None:
+            return None
+
+        file_path = upload_dir / filename
+        self._ensure_dir(file_path.parent)
+
+        # 编码/解码一次得到字节负载，fd级写入后fstat拿元数据，
+        # 免去写完再按路径os.stat走一遍路径解析。
+        # 超大base64负载按4字节对齐分块解码边写，峰值内存不再是编码串+整段解码的总和
+        is_b64 = file_data.get('is_base64', False)
+        stream_b64 = (
+            is_b64 and len(content) > _B64_STREAM_THRESHOLD
+            and len(content) % 4 == 0
+            and '\n' not in content and '\r' not in content
+        )
+        if stream_b64:
+            payload = None
+        elif is_b64:
+            payload = b64decode_as_bytearray(content)
+        else:
+            payload = content.encode('utf-8')
+
+        def _put() -> os.stat_result:
+            fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o644)
+            try:
+                if stream_b64:
+                    for i in range(0, len(content), _B64_STREAM_CHUNK):
+                        block = memoryview(b64decode_as_bytearray(content[i:i + _B64_STREAM_CHUNK]))
+                        while block:
+                            block = block[os.write(fd, block):]
+                else:
+                    view = memoryview(payload)
+                    while view:
+                        written = os.write(fd, view)
+                        view = view[written:]
+                return os.fstat(fd)
+            finally:
+                os.close(fd)
+
+        try:
+            file_stat = _put()
+        except FileNotFoundError:
+            # 目录缓存过期（目录在上次上传后被删除），重建后重试一次
+            self._forget_dir(file_path.parent)
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            file_stat = _put()
+        return {
+            'filename': filename,
+            'path': str(file_path),
+            'size': file_stat.st_size,
+            'created_at': datetime.fromtimestamp(file_stat.st_ctime).isoformat()
+        }
+
 
 class FileReadTool(LocalTool):
     """文件读取工具 - 支持自动编码检测"""
@@ -157,46 +543,108 @@ class FileReadTool(LocalTool):
             if not file_path:
                 return ToolResponse(success=False, error="file_path is required")
             
-            task_path = self.get_task_path(task_id, workspace_path)
-            full_path = task_path / file_path
+            full_path = self._resolve(task_id, workspace_path, file_path)
             
-            if not full_path.exists():
+            st = _stat_path(full_path)
+            if st is None:
                 return ToolResponse(success=False, error=f"File not found: {file_path}")
-            
-            if not full_path.is_file():
+
+            if not stat.S_ISREG(st.st_mode):
                 return ToolResponse(success=False, error=f"Not a file: {file_path}")
-            
+
             # 检查文件扩展名，禁止读取二进制文件
-            binary_extensions = {'.pdf', '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.ico', '.tiff', '.webp', 
-                                '.mp3', '.mp4', '.avi', '.mov', '.wav', '.zip', '.rar', '.7z', '.tar', '.gz',
-                                '.exe', '.dll', '.so', '.dylib', '.bin', '.dat', '.db', '.sqlite', '.pkl'}
-            
-            if full_path.suffix.lower() in binary_extensions:
+            suffix = full_path.suffix.lower()
+            if suffix in _BINARY_EXTS:
                 return ToolResponse(
-                    success=False, 
-                    error=f"Cannot read binary file: {file_path}. File type '{full_path.suffix}' is not supported for text reading."
+                    success=False,
+                    error=f"Cannot read binary file: {file_path}. File type '{suffix}' is not supported for text reading."
                 )
             
-            # 使用自动编码检测读取文件
-            try:
-                content, actual_encoding = read_file_with_encoding(full_path, encoding)
-                lines = content.splitlines(keepends=True)
-            except Exception as e:
-                return ToolResponse(success=False, error=f"读取文件失败: {str(e)}")
-            
-            total_lines = len(lines)
-            
+            # 使用自动编码检测读取文件（命中内容缓存时直接跳过读取）
+            cache_key = (str(full_path), st.st_mtime_ns, st.st_size, encoding or '')
+            cached = _read_cache_get(cache_key)
+            if cached is not None:
+                content, actual_encoding = cached
+            elif (start_line is not None or end_line is not None) and not encoding:
+                # 行区间+无显式编码：字节级定位行范围后只解码命中的切片。
+                # utf-8多字节序列不含0x0A字节，按换行切片是安全的；
+                # 从100k行文件取十几行时省掉整文件decode
+                raw = await asyncio.to_thread(full_path.read_bytes)
+
+                nl_offsets = [m.start() for m in _NEWLINE_BYTES_RE.finditer(raw)]
+                total_lines = len(nl_offsets)
+                if raw and not raw.endswith(b'\n'):
+                    total_lines += 1
+
+                start_idx = (start_line - 1) if start_line else 0
+                end_idx = end_line if end_line else total_lines
+                start_idx = max(0, min(start_idx, total_lines - 1))
+                end_idx = max(start_idx + 1, min(end_idx, total_lines))
+
+                slice_start = nl_offsets[start_idx - 1] + 1 if start_idx else 0
+                slice_end = nl_offsets[end_idx - 1] + 1 if end_idx <= len(nl_offsets) else len(raw)
+
+                try:
+                    final_content, actual_encoding = _fast_decode(raw[slice_start:slice_end])
+                    return ToolResponse(
+                        success=True,
+                        data={
+                            "content": final_content,
+                            "total_lines": total_lines,
+                            "line_range": f"{start_idx + 1}-{end_idx}",
+                            "file_path": file_path,
+                            "container_path": str(full_path),
+                            "detected_encoding": actual_encoding,
+                            "file_size": st.st_size
+                        }
+                    )
+                except UnicodeDecodeError:
+                    # 非utf-8文件回退到整读+多编码尝试路径
+                    pass
+
+                try:
+                    content, actual_encoding = read_file_with_encoding(full_path, encoding)
+                except Exception as e:
+                    return ToolResponse(success=False, error=f"读取文件失败: {str(e)}")
+                _read_cache_put(cache_key, content, actual_encoding)
+            else:
+                try:
+                    if encoding:
+                        content, actual_encoding = read_file_with_encoding(full_path, encoding)
+                    else:
+                        # 无显式编码先试ascii/utf-8直解码，失败再进多编码尝试
+                        try:
+                            content, actual_encoding = _fast_decode(full_path.read_bytes())
+                        except UnicodeDecodeError:
+                            content, actual_encoding = read_file_with_encoding(full_path, encoding)
+                except Exception as e:
+                    return ToolResponse(success=False, error=f"读取文件失败: {str(e)}")
+                _read_cache_put(cache_key, content, actual_encoding)
+
             if start_line is None and end_line is None:
+                # 整读场景不需要逐行拆分，count('\n')在C层统计行数
                 final_content = content
+                total_lines = content.count('\n')
+                if content and not content.endswith('\n'):
+                    total_lines += 1
                 line_range = f"1-{total_lines}"
             else:
+                # 行区间走换行偏移表+单次切片：一次C层扫描定位所有换行，
+                # 免去splitlines按行数分配再join的开销
+                nl_offsets = [m.start() for m in _NEWLINE_RE.finditer(content)]
+                total_lines = len(nl_offsets)
+                if content and not content.endswith('\n'):
+                    total_lines += 1
+
                 start_idx = (start_line - 1) if start_line else 0
                 end_idx = end_line if end_line else total_lines
-                
+
                 start_idx = max(0, min(start_idx, total_lines - 1))
                 end_idx = max(start_idx + 1, min(end_idx, total_lines))
-                
-                final_content = ''.join(lines[start_idx:end_idx])
+
+                slice_start = nl_offsets[start_idx - 1] + 1 if start_idx else 0
+                slice_end = nl_offsets[end_idx - 1] + 1 if end_idx <= len(nl_offsets) else len(content)
+                final_content = content[slice_start:slice_end]
                 line_range = f"{start_idx + 1}-{end_idx}"
             
             return ToolResponse(
@@ -208,7 +656,7 @@ class FileReadTool(LocalTool):
                     "file_path": file_path,
                     "container_path": str(full_path),
                     "detected_encoding": actual_encoding,
-                    "file_size": full_path.stat().st_size
+                    "file_size": st.st_size
                 }
             )
             
@@ -233,22 +681,35 @@ class FileWriteTool(LocalTool):
             if content == '':
                 return ToolResponse(success=False, error="content cannot be empty")
             
-            task_path = self.get_task_path(task_id, workspace_path)
-            full_path = task_path / file_path
-            
-            full_path.parent.mkdir(parents=True, exist_ok=True)
+            full_path = self._resolve(task_id, workspace_path, file_path)
+
+            self._ensure_dir(full_path.parent)
             
             if is_base64:
                 try:
-                    content = base64.b64decode(content).decode(encoding)
+                    decoded = await asyncio.to_thread(b64decode, content)
+                    content = decoded.decode(encoding)
                 except Exception as e:
                     return ToolResponse(success=False, error=f"Base64 decode error: {str(e)}")
-            
+
             write_mode = 'w' if mode == 'overwrite' else 'a'
-            
+
+            async def _do_write():
+                # 写盘放到线程池，避免大文件写入阻塞事件循环；
+                # 覆盖模式整写一次write_bytes，追加模式保留文本缓冲写
+                if write_mode == 'w':
+                    await asyncio.to_thread(_write_whole_file, full_path, content, encoding)
+                else:
+                    await asyncio.to_thread(_write_text_file, full_path, content, write_mode, encoding)
+
             try:
-                with open(full_path, write_mode, encoding=encoding) as f:
-                    f.write(content)
+                try:
+                    await _do_write()
+                except FileNotFoundError:
+                    # 目录缓存过期（目录在上次写入后被删除），重建后重试一次
+                    self._forget_dir(full_path.parent)
+                    full_path.parent.mkdir(parents=True, exist_ok=True)
+                    await _do_write()
             except UnicodeEncodeError as e:
                 return ToolResponse(success=False, error=f"编码错误 ({encoding}): {str(e)}。建议使用 utf-8 编码。")
             
@@ -287,25 +748,64 @@ class FileReplaceTool(LocalTool):
                     error="file_path, start_line, and end_line are required"
                 )
             
-            task_path = self.get_task_path(task_id, workspace_path)
-            full_path = task_path / file_path
-            
-            if not full_path.exists():
+            full_path = self._resolve(task_id, workspace_path, file_path)
+
+            st = _stat_path(full_path)
+            if st is None:
                 return ToolResponse(success=False, error=f"File not found: {file_path}")
-            
+
             if is_base64:
                 try:
-                    new_content = base64.b64decode(new_content).decode('utf-8')
+                    new_content = b64decode(new_content).decode('utf-8')
                 except Exception as e:
                     return ToolResponse(success=False, error=f"Failed to decode base64: {str(e)}")
-            
-            # 使用自动编码检测读取文件
+
+            # utf-8/ascii文件走字节级拼接快速路径：两次换行定位+一次切片，
+            # 不构建整份逐行str列表再writelines回写。
+            # 无显式编码时不跑chardet采样探测，直接读出字节做C层试解码验证
+            raw = None
+            if encoding:
+                probe_encoding = encoding.lower()
+            else:
+                raw = await asyncio.to_thread(full_path.read_bytes)
+                try:
+                    _, probe_encoding = _fast_decode(raw)
+                except UnicodeDecodeError:
+                    probe_encoding = ''
+            if probe_encoding in ('ascii', 'utf-8'):
+                if raw is None:
+                    raw = await asyncio.to_thread(full_path.read_bytes)
+                try:
+                    new_raw, new_line_count, total_lines = _splice_byte_lines(
+                        raw, start_line, end_line, new_content
+                    )
+                except ValueError as e:
+                    return ToolResponse(success=False, error=str(e))
+
+                await asyncio.to_thread(full_path.write_bytes, new_raw)
+
+                return ToolResponse(
+                    success=True,
+                    data={
+                        "file_path": file_path,
+                        "replaced_lines": f"{start_line}-{end_line}",
+                        "new_line_count": new_line_count,
+                        "total_lines": total_lines,
+                        "was_base64": is_base64,
+                        "original_encoding": probe_encoding,
+                        "write_encoding": 'utf-8'
+                    }
+                )
+
+            # 使用自动编码检测读取文件（阻塞读取放到线程池）
             try:
-                content, actual_encoding = read_file_with_encoding(full_path, encoding)
+                content, actual_encoding = await asyncio.to_thread(
+                    read_file_with_encoding, full_path, encoding
+                )
                 lines = content.splitlines(keepends=True)
             except Exception as e:
                 return ToolResponse(success=False, error=f"读取文件失败: {str(e)}")
-            
+
             total_lines = len(lines)
             start_idx = start_line - 1
             end_idx = end_line
@@ -326,12 +826,10 @@ class FileReplaceTool(LocalTool):
             write_encoding = actual_encoding if actual_encoding and 'with errors' not in actual_encoding else 'utf-8'
             
             try:
-                with open(full_path, 'w', encoding=write_encoding) as f:
-                    f.writelines(lines)
+                await asyncio.to_thread(_write_text_file, full_path, lines, 'w', write_encoding)
             except UnicodeEncodeError:
                 # 如果原编码写入失败，回退到utf-8
-                with open(full_path, 'w', encoding='utf-8') as f:
-                    f.writelines(lines)
+                await asyncio.to_thread(_write_text_file, full_path, lines, 'w', 'utf-8')
                 write_encoding = 'utf-8'
             
             return ToolResponse(
@@ -365,18 +863,21 @@ class FileDeleteTool(LocalTool):
             if not file_path:
                 return ToolResponse(success=False, error="file_path is required")
             
-            task_path = self.get_task_path(task_id, workspace_path)
-            full_path = task_path / file_path
-            
-            if not full_path.exists():
+            full_path = self._resolve(task_id, workspace_path, file_path)
+
+            # lstat判断类型：指向目录的符号链接按文件删除（只摘链接），
+            # 与shutil.rmtree拒绝跟进链接的行为一致
+            st = _stat_path(full_path, follow_symlinks=False)
+            if st is None:
                 return ToolResponse(success=False, error=f"File not found: {file_path}")
-            
-            file_type = "file" if full_path.is_file() else "directory"
-            
-            if full_path.is_file():
-                os.remove(full_path)
+
+            if stat.S_ISDIR(st.st_mode):
+                file_type = "directory"
+                # 大目录并行unlink，且放线程池避免阻塞事件循环
+                await asyncio.to_thread(_parallel_rmtree, full_path)
             else:
-                shutil.rmtree(full_path)
+                file_type = "file"
+                os.remove(full_path)
             
             return ToolResponse(
                 success=True,
@@ -415,8 +916,25 @@ class FileMoveTool(LocalTool):
                 return ToolResponse(success=False, error=f"Source not found: {src_path}")
             
             dest_full.parent.mkdir(parents=True, exist_ok=True)
-            shutil.move(str(src_full), str(dest_full))
-            
+
+            # 目标是已存在的目录时与shutil.move一致：移动到该目录内部
+            if dest_full.is_dir():
+                dest_full = dest_full / src_full.name
+
+            # 同设备直接rename（单个syscall）；跨设备时退回复制+删除，
+            # copyfile在Linux上内部走sendfile/copy_file_range零拷贝
+            try:
+                os.rename(src_full, dest_full)
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                if src_full.is_dir():
+                    shutil.copytree(str(src_full), str(dest_full))
+                    shutil.rmtree(str(src_full))
+                else:
+                    shutil.copyfile(str(src_full), str(dest_full))
+                    os.unlink(src_full)
+
             return ToolResponse(
                 success=True,
                 data={
@@ -468,53 +986,104 @@ class DirListTool(LocalTool):
         self.description = "列出目录内容"
     
     @require_read_access('dir_path')
-    async def execute(self, task_id: str, workspace_path: Path, dir_path: str = '', recursive: bool = False, **kwargs) -> ToolResponse:
+    async def execute(self, task_id: str, workspace_path: Path, dir_path: str = '', recursive: bool = False, max_entries: int = None, sort: bool = True, **kwargs) -> ToolResponse:
         try:
             task_path = self.get_task_path(task_id, workspace_path)
             full_path = task_path / dir_path if dir_path else task_path
-            
-            if not full_path.exists():
+
+            st = _stat_path(full_path)
+            if st is None:
                 return ToolResponse(success=False, error=f"Directory not found: {dir_path}")
-            
-            if not full_path.is_dir():
+
+            if not stat.S_ISDIR(st.st_mode):
                 return ToolResponse(success=False, error=f"Not a directory: {dir_path}")
             
-            def build_tree(path: Path, base_path: Path) -> Dict:
-                result = {
-                    "name": path.name,
-                    "type": "directory" if path.is_dir() else "file",
-                    "path": str(path.relative_to(base_path))
+            task_path_str = str(task_path)
+            # scandir给出的entry.path都在task_path之下，相对路径用前缀
+            # 切片得到，省掉os.path.relpath每条目的规范化路径运算
+            base_prefix = task_path_str + os.sep
+            prefix_len = len(base_prefix)
+
+            def rel_path(entry_path: str) -> str:
+                if entry_path.startswith(base_prefix):
+                    return entry_path[prefix_len:]
+                return os.path.relpath(entry_path, task_path_str)
+
+            # DirEntry把is_file/is_dir/stat信息缓存在readdir结果里，
+            # 避免Path.iterdir后每个条目再发2-3次stat syscall
+            def entry_node(entry: os.DirEntry) -> Dict:
+                is_dir_flag = entry.is_dir(follow_symlinks=False)
+                node = {
+                    "name": entry.name,
+                    "type": "directory" if is_dir_flag else "file",
+                    "path": rel_path(entry.path)
                 }
-                
-                if path.is_file():
-                    stat = path.stat()
-                    result["size"] = stat.st_size
-                elif path.is_dir() and recursive:
-                    # 禁止递归展开code_env文件夹
-                    if path.name == "code_env":
-                        # 不添加children，阻止递归展开
-                        pass
-                    else:
-                        result["children"] = []
-                        for child in sorted(path.iterdir()):
-                            result["children"].append(build_tree(child, base_path))
-                
-                return result
-            
+                if not is_dir_flag and entry.is_file(follow_symlinks=False):
+                    node["size"] = entry.stat(follow_symlinks=False).st_size
+                return node
+
+            def build_tree(root_str: str, root_name: str, root_rel: str) -> Dict:
+                """显式栈遍历构建目录树，深层目录不吃Python递归栈"""
+                root = {
+                    "name": root_name,
+                    "type": "directory",
+                    "path": root_rel
+                }
+
+                # 禁止递归展开code_env文件夹
+                if root_name == "code_env":
+                    return root
+
+                entry_count = 0
+                stack = deque([(root_str, root)])
+
+                while stack:
+                    dir_str, node = stack.pop()
+                    children = []
+                    node["children"] = children
+
+                    with os.scandir(dir_str) as it:
+                        # 按条目名str排序，不做Path整路径比较；调用方不需要
+                        # 有序结果时直接跳过排序
+                        entries = sorted(it, key=lambda e: e.name) if sort else list(it)
+
+                    for entry in entries:
+                        if max_entries is not None and entry_count >= max_entries:
+                            root["truncated"] = True
+                            return root
+                        entry_count += 1
+
+                        if entry.is_dir(follow_symlinks=False):
+                            child = {
+                                "name": entry.name,
+                                "type": "directory",
+                                "path": rel_path(entry.path)
+                            }
+                            children.append(child)
+                            # code_env只保留节点本身，不入栈展开
+                            if entry.name != "code_env":
+                                stack.append((entry.path, child))
+                        else:
+                            children.append(entry_node(entry))
+
+                return root
+
             if recursive:
-                tree = build_tree(full_path, task_path)
+                # 深树遍历可能耗时数百毫秒，放线程池执行，
+                # 不让一次dir_list挂起事件循环上的其他工具调用
+                tree = await asyncio.to_thread(
+                    build_tree,
+                    str(full_path), full_path.name,
+                    os.path.relpath(str(full_path), task_path_str)
+                )
             else:
-                items = []
-                for item in sorted(full_path.iterdir()):
-                    item_info = {
-                        "name": item.name,
-                        "type": "directory" if item.is_dir() else "file",
-                        "path": str(item.relative_to(task_path))
-                    }
-                    if item.is_file():
-                        item_info["size"] = item.stat().st_size
-                    items.append(item_info)
-                
+                def scan_flat() -> List[Dict]:
+                    with os.scandir(full_path) as it:
+                        entries = sorted(it, key=lambda e: e.name) if sort else list(it)
+                    return [entry_node(entry) for entry in entries]
+
+                items = await asyncio.to_thread(scan_flat)
+
                 tree = {
                     "name": full_path.name,
                     "type": "directory",
@@ -536,7 +1105,11 @@ class DirListTool(LocalTool):
 
 class FileSearchTool(LocalTool):
     """文本搜索工具 - 支持编码检测"""
-    
+
+    # 超过该大小改走整读+单次regex扫描：逐行循环的每行Python开销
+    # 在大文件上会成为主要成本，批量finditer全程在C层执行
+    BULK_SCAN_THRESHOLD = 256 * 1024
+
     def __init__(self):
         super().__init__()
         self.tool_name = "file_search"
@@ -551,33 +1124,46 @@ class FileSearchTool(LocalTool):
             if not search_text:
                 return ToolResponse(success=False, error="search_text is required")
             
-            task_path = self.get_task_path(task_id, workspace_path)
-            full_path = task_path / file_path
-            
-            if not full_path.exists():
+            full_path = self._resolve(task_id, workspace_path, file_path)
+
+            st = _stat_path(full_path)
+            if st is None:
                 return ToolResponse(success=False, error=f"File not found: {file_path}")
-            
-            if not full_path.is_file():
+
+            if not stat.S_ISREG(st.st_mode):
                 return ToolResponse(success=False, error=f"Not a file: {file_path}")
-            
+
             try:
-                # 使用自动编码检测读取文件
-                content, actual_encoding = read_file_with_encoding(full_path, encoding)
-                lines = content.splitlines()
-                
-                # 搜索匹配的行
-                matches = []
-                search_term = search_text if case_sensitive else search_text.lower()
-                
-                for line_num, line in enumerate(lines, 1):
-                    line_content = line if case_sensitive else line.lower()
-                    if search_term in line_content:
-                        matches.append({
-                            "line_number": line_num,
-                            "line_content": line.rstrip('\n\r'),
-                            "match_positions": self._find_match_positions(line_content, search_term)
-                        })
-                
+                # 确定解码方式：显式指定优先，否则用探测结果
+                if encoding:
+                    read_encoding = encoding
+                else:
+                    read_encoding, _ = detect_file_encoding(full_path)
+
+                probe_encoding = (read_encoding or '').lower()
+                if (probe_encoding in ('ascii', 'utf-8')
+                        and (case_sensitive or search_text.isascii())):
+                    # ascii/utf-8文件字节层直搜，只解码命中的行，
+                    # 省掉整文件decode（大小写折叠仅限ASCII，故有isascii守卫）
+                    raw = full_path.read_bytes()
+                    matches, total_lines = self._scan_bytes(raw, search_text, case_sensitive)
+                    actual_encoding = read_encoding
+                elif st.st_size > self.BULK_SCAN_THRESHOLD:
+                    # 大文件整读后单次扫描，避免逐行循环的每行开销
+                    content, actual_encoding = read_file_with_encoding(full_path, encoding)
+                    matches, total_lines = self._scan_buffer(content, search_text, case_sensitive)
+                else:
+                    try:
+                        # 小文件流式逐行扫描，内存占用与文件大小无关
+                        with open(full_path, 'r', encoding=read_encoding,
+                                  buffering=_read_buffering(st.st_size)) as f:
+                            matches, total_lines = self._scan_lines(f, search_text, case_sensitive)
+                        actual_encoding = read_encoding
+                    except (UnicodeDecodeError, UnicodeError, LookupError):
+                        # 流式解码失败时回退到整读+多编码尝试
+                        content, actual_encoding = read_file_with_encoding(full_path, encoding)
+                        matches, total_lines = self._scan_buffer(content, search_text, case_sensitive)
+
                 return ToolResponse(
                     success=True,
                     data={
@@ -585,29 +1171,114 @@ class FileSearchTool(LocalTool):
                         "search_text": search_text,
                         "case_sensitive": case_sensitive,
                         "total_matches": len(matches),
-                        "total_lines": len(lines),
+                        "total_lines": total_lines,
                         "matches": matches,
                         "detected_encoding": actual_encoding
                     }
                 )
-                
+
             except Exception as e:
                 return ToolResponse(success=False, error=f"读取或搜索文件失败: {str(e)}")
             
         except Exception as e:
             return ToolResponse(success=False, error=str(e))
-    
-    def _find_match_positions(self, line: str, search_term: str) -> List[int]:
-        """查找搜索词在行中的位置"""
-        positions = []
-        start = 0
-        while True:
-            pos = line.find(search_term, start)
-            if pos == -1:
-                break
-            positions.append(pos)
-            start = pos + 1
-        return positions 
+
+    @staticmethod
+    def _compile_pattern(search_text: str, case_sensitive: bool):
+        """编译一次正则；大小写不敏感交给IGNORECASE，省掉每行的lower()拷贝"""
+        return re.compile(
+            re.escape(search_text),
+            0 if case_sensitive else re.IGNORECASE
+        )
+
+    def _scan_lines(self, lines, search_text: str, case_sensitive: bool) -> Tuple[List[Dict], int]:
+        """逐行扫描可迭代的行序列，返回(匹配列表, 总行数)"""
+        pattern = self._compile_pattern(search_text, case_sensitive)
+        matches = []
+        line_num = 0
+
+        for line_num, line in enumerate(lines, 1):
+            positions = [m.start() for m in pattern.finditer(line)]
+            if positions:
+                matches.append({
+                    "line_number": line_num,
+                    "line_content": line.rstrip('\n\r'),
+                    "match_positions": positions
+                })
+
+        return matches, line_num
+
+    def _scan_buffer(self, content: str, search_text: str, case_sensitive: bool) -> Tuple[List[Dict], int]:
+        """对整段内容做单次扫描，换行偏移表+bisect把匹配映射回行号。
+
+        整读回退路径用：一次finditer覆盖全文，不做逐行拆分与逐行lower()分配。
+        """
+        pattern = self._compile_pattern(search_text, case_sensitive)
+
+        # 换行偏移表，一次C层扫描
+        nl_offsets = [m.start() for m in _NEWLINE_RE.finditer(content)]
+        total_lines = len(nl_offsets)
+        if content and not content.endswith('\n'):
+            total_lines += 1
+
+        matches = []
+        current = None
+
+        for m in pattern.finditer(content):
+            line_idx = bisect.bisect_right(nl_offsets, m.start())
+            line_start = nl_offsets[line_idx - 1] + 1 if line_idx else 0
+
+            if current is None or current["line_number"] != line_idx + 1:
+                line_end = nl_offsets[line_idx] if line_idx < len(nl_offsets) else len(content)
+                current = {
+                    "line_number": line_idx + 1,
+                    "line_content": content[line_start:line_end].rstrip('\n\r'),
+                    "match_positions": []
+                }
+                matches.append(current)
+
+            current["match_positions"].append(m.start() - line_start)
+
+        return matches, total_lines
+
+    def _scan_bytes(self, raw: bytes, search_text: str, case_sensitive: bool) -> Tuple[List[Dict], int]:
+        """字节层单次扫描，仅解码命中的行。
+
+        ascii/utf-8文件的快路径：不做全文decode，匹配定位全在bytes上完成，
+        行内字符位置通过只解码该行后用str正则复算，保证非ASCII行偏移正确。
+        """
+        byte_pattern = re.compile(
+            re.escape(search_text.encode('utf-8')),
+            0 if case_sensitive else re.IGNORECASE
+        )
+        text_pattern = self._compile_pattern(search_text, case_sensitive)
+
+        nl_offsets = [m.start() for m in _NEWLINE_BYTES_RE.finditer(raw)]
+        total_lines = len(nl_offsets)
+        if raw and not raw.endswith(b'\n'):
+            total_lines += 1
+
+        matches = []
+        seen_lines = set()
+
+        for m in byte_pattern.finditer(raw):
+            line_idx = bisect.bisect_right(nl_offsets, m.start())
+            line_number = line_idx + 1
+            if line_number in seen_lines:
+                continue
+            seen_lines.add(line_number)
+
+            line_start = nl_offsets[line_idx - 1] + 1 if line_idx else 0
+            line_end = nl_offsets[line_idx] if line_idx < len(nl_offsets) else len(raw)
+            line_text = raw[line_start:line_end].decode('utf-8', errors='replace').rstrip('\r\n')
+
+            matches.append({
+                "line_number": line_number,
+                "line_content": line_text,
+                "match_positions": [t.start() for t in text_pattern.finditer(line_text)]
+            })
+
+        return matches, total_lines
 
 
 class FileCopyTool(LocalTool):
@@ -631,22 +1302,26 @@ class FileCopyTool(LocalTool):
             src_full = task_path / src_path
             dest_full = task_path / dest_path
             
-            if not src_full.exists():
+            src_st = _stat_path(src_full)
+            if src_st is None:
                 return ToolResponse(success=False, error=f"Source not found: {src_path}")
-            
+
             # 如果源是文件，则校验后缀名一致
-            if src_full.is_file():
+            if stat.S_ISREG(src_st.st_mode):
                 if src_full.suffix != dest_full.suffix:
                     return ToolResponse(
                         success=False,
                         error=f"File extension mismatch: {src_full.suffix} != {dest_full.suffix}"
                     )
                 dest_full.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(str(src_full), str(dest_full))
+                await asyncio.to_thread(_copy_file_fast, src_full, dest_full)
             else:
-                # 目录复制
+                # 目录复制（单文件走内核级copy_file_range）
                 dest_full.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copytree(str(src_full), str(dest_full), dirs_exist_ok=True)
+                await asyncio.to_thread(
+                    shutil.copytree, str(src_full), str(dest_full),
+                    dirs_exist_ok=True, copy_function=_copy_file_fast
+                )
             
             return ToolResponse(
                 success=True,
@@ -661,11 +1336,41 @@ class FileCopyTool(LocalTool):
         
 class FileURLDownloadTool(LocalTool):
     """文件下载工具"""
-    
+
+    _HEADERS = {
+        "User-Agent": (
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+            "AppleWebKit/537.36 (KHTML, like Gecko) "
+            "Chrome/115.0 Safari/537.36"
+        ),
+        "Accept": "*/*",
+        "Accept-Language": "zh-CN,zh;q=0.9",
+    }
+
     def __init__(self):
         super().__init__()
         self.tool_name = "download_file_from_url"
         self.description = "下载文件到本地"
+        self._session = None
+
+    async def _get_session(self):
+        """懒初始化并复用ClientSession：连接池/TLS握手只付一次成本"""
+        import aiohttp
+
+        if self._session is None or self._session.closed:
+            # 不限总时长（大文件下载），但单次socket读超时60s防止对端挂死
+            timeout = aiohttp.ClientTimeout(total=None, sock_read=60)
+            # keep-alive+DNS缓存：同主机批量下载免去重复的DNS/TCP/TLS握手
+            connector = aiohttp.TCPConnector(
+                limit=100,
+                limit_per_host=10,
+                ttl_dns_cache=300,
+                keepalive_timeout=60
+            )
+            self._session = aiohttp.ClientSession(
+                headers=self._HEADERS, timeout=timeout, connector=connector
+            )
+        return self._session
     
     @bypass_lock_check
     async def execute(self, task_id: str, workspace_path: Path, download_url: str, save_path: str, **kwargs) -> ToolResponse:
@@ -695,30 +1400,19 @@ class FileURLDownloadTool(LocalTool):
         except Exception as e:
             return ToolResponse(success=False, error=str(e))
     async def download_file(self, url: str, save_path: Path) -> ToolResponse:
-        """下载文件的辅助方法"""
-        import aiohttp
-        
+        """下载文件的辅助方法（按1MB分块流式落盘，不整体缓冲进内存）"""
         try:
-            headers = {
-                "User-Agent": (
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/115.0 Safari/537.36"
-                ),
-                "Accept": "*/*",
-                "Accept-Language": "zh-CN,zh;q=0.9",
-            }
-
-            async with aiohttp.ClientSession(headers=headers) as session:
-                async with session.get(url) as response:
-                    if response.status != 200:
-                        return ToolResponse(success=False, error=f"下载失败，HTTP状态码: {response.status}")
-                    
-                    with open(save_path, 'wb') as f:
-                        content = await response.read()
-                        f.write(content)
-            
+            session = await self._get_session()
+            async with session.get(url) as response:
+                if response.status != 200:
+                    return ToolResponse(success=False, error=f"下载失败，HTTP状态码: {response.status}")
+
+                with open(save_path, 'wb') as f:
+                    async for chunk in response.content.iter_chunked(1 << 20):
+                        # 写盘放线程池，避免磁盘慢时反压卡住事件循环
+                        await asyncio.to_thread(f.write, chunk)
+
             return ToolResponse(success=True)
-        
+
         except Exception as e:
             return ToolResponse(success=False, error=f"下载过程中发生错误: {str(e)}")
@@ -1,10 +1,385 @@
-import requests
 import os
-from typing import Dict, Any, List, Optional
+import json
+import time
+import asyncio
+import aiohttp
+from collections import OrderedDict
+from functools import lru_cache
+from types import MappingProxyType
+from urllib.parse import urlencode
+from typing import Dict, Any, List, Mapping, Optional, Tuple
 from .base_tool import LocalTool
 from utils.response import ToolResponse
 from utils.logger import global_logger
 
+# orjson解析大响应体快2-3倍（100条搜索结果约数百KB），没装则退回stdlib
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+
+def _json_loads(raw: bytes) -> Any:
+    """解析响应体字节（优先orjson）"""
+    if _orjson is not None:
+        return _orjson.loads(raw)
+    return json.loads(raw)
+
+# 模块级共享session：搜索/仓库信息两个工具共用一个连接池，
+# keep-alive复用省掉每次调用的DNS/TCP/TLS握手
+_session: Optional[aiohttp.ClientSession] = None
+_session_lock = asyncio.Lock()
+
+
+async def _get_session() -> aiohttp.ClientSession:
+    """懒初始化共享ClientSession"""
+    global _session
+    if _session is None or _session.closed:
+        async with _session_lock:
+            if _session is None or _session.closed:
+                connector = aiohttp.TCPConnector(
+                    limit=32, limit_per_host=16, keepalive_timeout=60
+                )
+                _session = aiohttp.ClientSession(connector=connector)
+    return _session
+
+
+async def close_session():
+    """关闭共享session（服务停机时调用）"""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+@lru_cache(maxsize=8)
+def _headers_for(token: str) -> Mapping[str, str]:
+    """同一token的请求头构建一次后复用（只读视图，防止跨调用被改写）
+
+    用官方推荐的vnd.github+json媒体类型加显式API版本号，
+    替代已弃用的v3媒体类型，响应更精简。
+    """
+    return MappingProxyType({
+        'Authorization': f'Bearer {token}',
+        'Accept': 'application/vnd.github+json',
+        'X-GitHub-Api-Version': '2022-11-28'
+    })
+
+
+class _TokenPool:
+    """GitHub令牌池：支持GITHUB_TOKENS（逗号分隔）多token轮换
+
+    跟踪每个token响应头里的X-RateLimit-Remaining/Reset，选配额
+    剩得最多的token；耗尽的token在reset时间点之前跳过。多token
+    时有效配额随token数线性扩大。
+    """
+
+    _DEFAULT_REMAINING = 5000
+
+    def __init__(self):
+        self._tokens: List[str] = []
+        # token -> (remaining, reset时间戳)
+        self._state: Dict[str, Tuple[int, float]] = {}
+        self._loaded_env: Optional[str] = None
+
+    def _load(self):
+        """从环境变量加载token列表（变化时重建状态）"""
+        env = os.getenv('GITHUB_TOKENS') or os.getenv('GITHUB_TOKEN') or ''
+        if env != self._loaded_env:
+            self._loaded_env = env
+            self._tokens = [t.strip() for t in env.split(',') if t.strip()]
+            self._state = {t: (self._DEFAULT_REMAINING, 0.0) for t in self._tokens}
+
+    def acquire(self) -> Optional[str]:
+        """返回剩余配额最多的可用token，全部耗尽且未到reset则返回None"""
+        self._load()
+        now = time.time()
+        best = None
+        best_remaining = -1
+        for token in self._tokens:
+            remaining, reset_ts = self._state[token]
+            if remaining <= 0:
+                if now < reset_ts:
+                    continue
+                # reset已过，视为配额恢复
+                remaining = self._DEFAULT_REMAINING
+                self._state[token] = (remaining, 0.0)
+            if remaining > best_remaining:
+                best = token
+                best_remaining = remaining
+        return best
+
+    def report(self, token: str, headers) -> None:
+        """用响应头更新token的配额状态"""
+        if token not in self._state:
+            return
+        try:
+            remaining = int(headers.get('X-RateLimit-Remaining', self._DEFAULT_REMAINING))
+            reset_ts = float(headers.get('X-RateLimit-Reset', 0))
+        except (TypeError, ValueError):
+            return
+        self._state[token] = (remaining, reset_ts)
+
+    def exhaust(self, token: str, reset_ts: Optional[float] = None) -> None:
+        """403限流时把token标记为耗尽，直到reset时间点"""
+        if token not in self._state:
+            return
+        if not reset_ts:
+            reset_ts = time.time() + 60.0
+        self._state[token] = (0, reset_ts)
+
+
+_TOKEN_POOL = _TokenPool()
+
+
+# ETag条件请求缓存：key -> (etag, 已解析的JSON body)。
+# GitHub对304不扣主rate limit，重复轮询时既省带宽也省配额
+_ETAG_CACHE: "OrderedDict[str, Tuple[str, Any]]" = OrderedDict()
+_ETAG_CACHE_MAX = 256
+
+
+# 瞬时故障重试参数：429/5xx指数退避，403限流等reset（超过上限就放弃）
+_RETRYABLE_STATUSES = frozenset({429, 502, 503, 504})
+_MAX_RETRIES = 5
+_MAX_BACKOFF = 60.0
+
+
+def _etag_cache_key(url: str, params: Optional[Dict[str, str]] = None) -> str:
+    """缓存键：URL + 排序后的查询参数"""
+    if params:
+        return f"GET:{url}?{urlencode(sorted(params.items()))}"
+    return f"GET:{url}"
+
+
+async def _conditional_get(url: str, headers: Dict[str, str],
+                           params: Optional[Dict[str, str]] = None,
+                           token: Optional[str] = None) -> Tuple[int, Any, str]:
+    """带If-None-Match的GET，返回(status, json_data, error_text)
+
+    命中缓存的ETag时带条件头发请求；服务端返回304则直接复用
+    缓存的解析结果（对调用方呈现为200），否则走正常路径并在
+    200时把新的(etag, body)写回缓存。传入token时把响应头里的
+    配额信息回报令牌池，403限流会换下一个token重试。
+
+    瞬时故障自动恢复：429/5xx按指数退避（尊重Retry-After）重试；
+    403限流且无备用token时，reset在近期则等到reset再试。
+    """
+    key = _etag_cache_key(url, params)
+    cached = _ETAG_CACHE.get(key)
+    if cached is not None:
+        _ETAG_CACHE.move_to_end(key)
+        headers = dict(headers)
+        headers['If-None-Match'] = cached[0]
+
+    session = await _get_session()
+    attempts = 0
+    while True:
+        async with session.get(url, headers=headers, params=params,
+                               timeout=aiohttp.ClientTimeout(total=30)) as response:
+            status = response.status
+            if token:
+                _TOKEN_POOL.report(token, response.headers)
+            if status == 304 and cached is not None:
+                return 200, cached[1], ''
+            if status == 200:
+                data = _json_loads(await response.read())
+                etag = response.headers.get('ETag')
+                if etag:
+                    _ETAG_CACHE[key] = (etag, data)
+                    _ETAG_CACHE.move_to_end(key)
+                    while len(_ETAG_CACHE) > _ETAG_CACHE_MAX:
+                        _ETAG_CACHE.popitem(last=False)
+                return 200, data, ''
+            text = await response.text()
+            try:
+                reset_ts = float(response.headers.get('X-RateLimit-Reset', 0))
+            except (TypeError, ValueError):
+                reset_ts = 0.0
+            try:
+                retry_after = float(response.headers.get('Retry-After', 0))
+            except (TypeError, ValueError):
+                retry_after = 0.0
+
+        # 瞬时故障：指数退避后重试（Retry-After优先）
+        if status in _RETRYABLE_STATUSES and attempts < _MAX_RETRIES:
+            delay = min(max(retry_after, float(2 ** attempts)), _MAX_BACKOFF)
+            global_logger.warning(
+                f"GitHub API {status}, retrying in {delay:.1f}s (attempt {attempts + 1}/{_MAX_RETRIES})"
+            )
+            await asyncio.sleep(delay)
+            attempts += 1
+            continue
+
+        # 当前token限流：标记耗尽，优先换池里的下一个token重试
+        if status == 403 and token and 'rate limit' in text.lower() and attempts < _MAX_RETRIES:
+            _TOKEN_POOL.exhaust(token, reset_ts)
+            next_token = _TOKEN_POOL.acquire()
+            if next_token and next_token != token:
+                token = next_token
+                headers = dict(headers)
+                headers['Authorization'] = f'Bearer {token}'
+                attempts += 1
+                continue
+            # 无备用token：reset在近期就等到reset，否则放弃
+            wait = reset_ts - time.time()
+            if 0 < wait <= _MAX_BACKOFF:
+                global_logger.warning(
+                    f"GitHub rate limit hit, waiting {wait:.1f}s for reset "
+                    f"(attempt {attempts + 1}/{_MAX_RETRIES})"
+                )
+                await asyncio.sleep(wait)
+                attempts += 1
+                continue
+        return status, None, text
+
+
+# 搜索结果字段投影表：预编译(输入键, 输出键, 默认值)三元组，
+# 热循环里一个dict推导替代20多次逐字段.get链，per_page=100时省得可观
+_SEARCH_REPO_FIELDS = (
+    ('name', 'name', ''),
+    ('full_name', 'full_name', ''),
+    ('description', 'description', ''),
+    ('html_url', 'html_url', ''),
+    ('clone_url', 'clone_url', ''),
+    ('ssh_url', 'ssh_url', ''),
+    ('stargazers_count', 'stars', 0),
+    ('forks_count', 'forks', 0),
+    ('watchers_count', 'watchers', 0),
+    ('language', 'language', ''),
+    ('created_at', 'created_at', ''),
+    ('updated_at', 'updated_at', ''),
+    ('pushed_at', 'pushed_at', ''),
+    ('size', 'size', 0),
+    ('default_branch', 'default_branch', ''),
+    ('topics', 'topics', []),
+    ('archived', 'archived', False),
+    ('disabled', 'disabled', False),
+    ('private', 'private', False),
+)
+
+
+def _project_search_repo(repo: Dict[str, Any]) -> Dict[str, Any]:
+    """按投影表整形单个搜索结果（owner/license嵌套字段单独处理）"""
+    get = repo.get
+    formatted = {key_out: get(key_in, default) for key_in, key_out, default in _SEARCH_REPO_FIELDS}
+    owner = get('owner') or {}
+    formatted['owner'] = {
+        'login': owner.get('login', ''),
+        'avatar_url': owner.get('avatar_url', ''),
+        'html_url': owner.get('html_url', '')
+    }
+    license_info = get('license')
+    formatted['license'] = license_info.get('name', '') if license_info else ''
+    return formatted
+
+
+# GraphQL批量查询用的字段片段：一次POST拿N个仓库，整个查询只扣1个配额点
+_GRAPHQL_REPO_FRAGMENT = """fragment RepoFields on Repository {
+  name
+  nameWithOwner
+  description
+  url
+  sshUrl
+  stargazerCount
+  forkCount
+  watchers { totalCount }
+  primaryLanguage { name }
+  createdAt
+  updatedAt
+  pushedAt
+  diskUsage
+  defaultBranchRef { name }
+  owner { login avatarUrl url }
+  licenseInfo { name }
+  repositoryTopics(first: 20) { nodes { topic { name } } }
+  isArchived
+  isDisabled
+  isPrivate
+  homepageUrl
+  hasIssuesEnabled
+  hasProjectsEnabled
+  hasWikiEnabled
+  issues(states: OPEN) { totalCount }
+}"""
+
+
+def _format_graphql_repo(node: Dict[str, Any]) -> Dict[str, Any]:
+    """把GraphQL节点整形成与REST路径一致的repo_info结构"""
+    full_name = node.get('nameWithOwner', '')
+    owner = node.get('owner') or {}
+    default_branch = node.get('defaultBranchRef') or {}
+    language = node.get('primaryLanguage') or {}
+    license_info = node.get('licenseInfo') or {}
+    topics = [
+        n['topic']['name']
+        for n in (node.get('repositoryTopics') or {}).get('nodes', [])
+        if n.get('topic')
+    ]
+    return {
+        'name': node.get('name', ''),
+        'full_name': full_name,
+        'description': node.get('description', '') or '',
+        'html_url': node.get('url', ''),
+        'clone_url': f"{node.get('url', '')}.git" if node.get('url') else '',
+        'ssh_url': node.get('sshUrl', ''),
+        'stars': node.get('stargazerCount', 0),
+        'forks': node.get('forkCount', 0),
+        'watchers': (node.get('watchers') or {}).get('totalCount', 0),
+        'language': language.get('name', '') or '',
+        'created_at': node.get('createdAt', ''),
+        'updated_at': node.get('updatedAt', ''),
+        'pushed_at': node.get('pushedAt', ''),
+        'size': node.get('diskUsage', 0) or 0,
+        'default_branch': default_branch.get('name', '') or '',
+        'owner': {
+            'login': owner.get('login', ''),
+            'avatar_url': owner.get('avatarUrl', ''),
+            'html_url': owner.get('url', '')
+        },
+        'license': license_info.get('name', '') or '',
+        'topics': topics,
+        'archived': node.get('isArchived', False),
+        'disabled': node.get('isDisabled', False),
+        'private': node.get('isPrivate', False),
+        'homepage': node.get('homepageUrl', '') or '',
+        'has_issues': node.get('hasIssuesEnabled', False),
+        'has_projects': node.get('hasProjectsEnabled', False),
+        'has_wiki': node.get('hasWikiEnabled', False),
+        'has_pages': False,
+        'open_issues_count': (node.get('issues') or {}).get('totalCount', 0),
+        'network_count': 0,
+        'subscribers_count': 0
+    }
+
+
+# 仓库信息TTL缓存：full_name -> (过期时刻, repo_info)。
+# 仓库元数据变化很慢，短TTL内的重复查询直接免掉整个往返
+_REPO_INFO_CACHE: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_REPO_INFO_CACHE_MAX = 512
+_REPO_INFO_TTL = 120.0
+
+
+def _repo_cache_get(full_name: str) -> Optional[Dict[str, Any]]:
+    """按full_name取未过期的缓存结果，返回副本防止调用方改写"""
+    key = full_name.lower()
+    entry = _REPO_INFO_CACHE.get(key)
+    if entry is None:
+        return None
+    if time.monotonic() >= entry[0]:
+        del _REPO_INFO_CACHE[key]
+        return None
+    _REPO_INFO_CACHE.move_to_end(key)
+    return dict(entry[1])
+
+
+def _repo_cache_put(full_name: str, repo_info: Dict[str, Any]):
+    """写入缓存并按LRU淘汰"""
+    key = full_name.lower()
+    _REPO_INFO_CACHE[key] = (time.monotonic() + _REPO_INFO_TTL, repo_info)
+    _REPO_INFO_CACHE.move_to_end(key)
+    while len(_REPO_INFO_CACHE) > _REPO_INFO_CACHE_MAX:
+        _REPO_INFO_CACHE.popitem(last=False)
+
 
 class GitHubSearchTool(LocalTool):
     """GitHub 搜索工具集（主机端运行）"""
@@ -16,23 +391,20 @@ class GitHubSearchTool(LocalTool):
         self.base_url = "https://api.github.com"
     
     def _get_github_token(self, token: Optional[str] = None) -> str:
-        """获取 GitHub Token"""
+        """获取 GitHub Token（未显式传入时从令牌池按剩余配额选取）"""
         if token:
             return token
-        
-        # 从环境变量获取
-        env_token = os.getenv('GITHUB_TOKEN')
-        if env_token:
-            return env_token
-        
+
+        # 从令牌池获取（支持GITHUB_TOKENS多token，兼容单GITHUB_TOKEN）
+        pooled_token = _TOKEN_POOL.acquire()
+        if pooled_token:
+            return pooled_token
+
         raise ValueError("GitHub Token is required. Please provide token parameter or set GITHUB_TOKEN environment variable.")
     
-    def _get_headers(self, token: str) -> Dict[str, str]:
-        """获取请求头"""
-        return {
-            'Authorization': f'token {token}',
-            'Accept': 'application/vnd.github.v3+json'
-        }
+    def _get_headers(self, token: str) -> Mapping[str, str]:
+        """获取请求头（按token缓存的只读映射）"""
+        return _headers_for(token)
     
     async def execute(self, task_id: str, workspace_path, query: str, 
                                        sort: str = 'stars', order: str = 'desc',
@@ -64,51 +436,22 @@ class GitHubSearchTool(LocalTool):
                 'q': search_query,
                 'sort': sort,
                 'order': order,
-                'per_page': min(per_page, 100),  # GitHub API 限制最大100
-                'page': page
+                'per_page': str(min(per_page, 100)),  # GitHub API 限制最大100
+                'page': str(page)
             }
-            
+
             global_logger.info(f"Searching GitHub repositories with query: '{query}'")
-            
-            # 发送请求
-            response = requests.get(search_url, headers=headers, params=params, timeout=30)
-            
-            if response.status_code == 200:
-                data = response.json()
+
+            # 发送请求（条件请求：304时直接复用缓存结果）
+            status_code, data, response_text = await _conditional_get(search_url, headers, params, token=github_token)
+
+            if status_code == 200:
                 repositories = data.get('items', [])
-                
-                # 格式化结果
-                formatted_repos = []
-                for repo in repositories:
-                    formatted_repo = {
-                        'name': repo.get('name', ''),
-                        'full_name': repo.get('full_name', ''),
-                        'description': repo.get('description', ''),
-                        'html_url': repo.get('html_url', ''),
-                        'clone_url': repo.get('clone_url', ''),
-                        'ssh_url': repo.get('ssh_url', ''),
-                        'stars': repo.get('stargazers_count', 0),
-                        'forks': repo.get('forks_count', 0),
-                        'watchers': repo.get('watchers_count', 0),
-                        'language': repo.get('language', ''),
-                        'created_at': repo.get('created_at', ''),
-                        'updated_at': repo.get('updated_at', ''),
-                        'pushed_at': repo.get('pushed_at', ''),
-                        'size': repo.get('size', 0),
-                        'default_branch': repo.get('default_branch', ''),
-                        'owner': {
-                            'login': repo.get('owner', {}).get('login', ''),
-                            'avatar_url': repo.get('owner', {}).get('avatar_url', ''),
-                            'html_url': repo.get('owner', {}).get('html_url', '')
-                        },
-                        'license': repo.get('license', {}).get('name', '') if repo.get('license') else '',
-                        'topics': repo.get('topics', []),
-                        'archived': repo.get('archived', False),
-                        'disabled': repo.get('disabled', False),
-                        'private': repo.get('private', False)
-                    }
-                    formatted_repos.append(formatted_repo)
-                
+
+                # 格式化结果（预编译投影表）
+                formatted_repos = [_project_search_repo(repo) for repo in repositories]
+
+
                 result_data = {
                     'total_count': data.get('total_count', 0),
                     'incomplete_results': data.get('incomplete_results', False),
@@ -127,20 +470,22 @@ class GitHubSearchTool(LocalTool):
                     data=result_data
                 )
                 
-            elif response.status_code == 403:
+            elif status_code == 403:
+                # 错误体只做一次小写化，两个子串检查共用同一份快照
+                text_lower = response_text.lower()
                 error_msg = "GitHub API rate limit exceeded or authentication failed"
-                if 'rate limit' in response.text.lower():
+                if 'rate limit' in text_lower:
                     error_msg = "GitHub API rate limit exceeded. Please wait or use a different token."
-                elif 'authentication' in response.text.lower():
+                elif 'authentication' in text_lower:
                     error_msg = "GitHub authentication failed. Please check your token."
-                
+
                 global_logger.error(f"GitHub API error: {error_msg}")
                 return ToolResponse(
                     success=False,
                     error=error_msg
                 )
-                
-            elif response.status_code == 422:
+
+            elif status_code == 422:
                 error_msg = f"Invalid search query: {query}"
                 global_logger.error(f"GitHub API error: {error_msg}")
                 return ToolResponse(
@@ -149,23 +494,23 @@ class GitHubSearchTool(LocalTool):
                 )
                 
             else:
-                error_msg = f"GitHub API error: {response.status_code} - {response.text}"
+                error_msg = f"GitHub API error: {status_code} - {response_text}"
                 global_logger.error(error_msg)
                 return ToolResponse(
                     success=False,
                     error=error_msg
                 )
-                
-        except requests.exceptions.Timeout:
+
+        except asyncio.TimeoutError:
             error_msg = "GitHub API request timeout"
             global_logger.error(error_msg)
             return ToolResponse(success=False, error=error_msg)
-            
-        except requests.exceptions.RequestException as e:
+
+        except aiohttp.ClientError as e:
             error_msg = f"GitHub API request failed: {str(e)}"
             global_logger.error(error_msg)
             return ToolResponse(success=False, error=error_msg)
-            
+
         except Exception as e:
             error_msg = f"GitHub search error: {str(e)}"
             global_logger.error(error_msg)
@@ -182,23 +527,20 @@ class GitHubRepoInfoTool(LocalTool):
         self.base_url = "https://api.github.com"
     
     def _get_github_token(self, token: Optional[str] = None) -> str:
-        """获取 GitHub Token"""
+        """获取 GitHub Token（未显式传入时从令牌池按剩余配额选取）"""
         if token:
             return token
-        
-        # 从环境变量获取
-        env_token = os.getenv('GITHUB_TOKEN')
-        if env_token:
-            return env_token
-        
+
+        # 从令牌池获取（支持GITHUB_TOKENS多token，兼容单GITHUB_TOKEN）
+        pooled_token = _TOKEN_POOL.acquire()
+        if pooled_token:
+            return pooled_token
+
         raise ValueError("GitHub Token is required. Please provide token parameter or set GITHUB_TOKEN environment variable.")
     
-    def _get_headers(self, token: str) -> Dict[str, str]:
-        """获取请求头"""
-        return {
-            'Authorization': f'token {token}',
-            'Accept': 'application/vnd.github.v3+json'
-        }
+    def _get_headers(self, token: str) -> Mapping[str, str]:
+        """获取请求头（按token缓存的只读映射）"""
+        return _headers_for(token)
     
     async def execute(self, task_id: str, workspace_path, full_name: str,
                      token: Optional[str] = None, **kwargs) -> ToolResponse:
@@ -217,17 +559,21 @@ class GitHubRepoInfoTool(LocalTool):
             github_token = self._get_github_token(token)
             headers = self._get_headers(github_token)
             
+            # TTL缓存命中：零网络开销直接返回
+            cached_info = _repo_cache_get(full_name)
+            if cached_info is not None:
+                return ToolResponse(success=True, data=cached_info)
+
             # 构建API URL
             api_url = f"{self.base_url}/repos/{full_name}"
-            
+
             global_logger.info(f"Getting repository info for: {full_name}")
-            
-            # 发送请求
-            response = requests.get(api_url, headers=headers, timeout=30)
-            
-            if response.status_code == 200:
-                repo = response.json()
-                
+
+            # 发送请求（条件请求：304时直接复用缓存结果）
+            status_code, repo, response_text = await _conditional_get(api_url, headers, token=github_token)
+
+            if status_code == 200:
+
                 # 格式化结果
                 repo_info = {
                     'name': repo.get('name', ''),
@@ -266,23 +612,158 @@ class GitHubRepoInfoTool(LocalTool):
                 }
                 
                 global_logger.info(f"Retrieved info for repository: {full_name}")
-                
+
+                _repo_cache_put(full_name, repo_info)
+
                 return ToolResponse(
                     success=True,
                     data=repo_info
                 )
                 
-            elif response.status_code == 404:
+            elif status_code == 404:
                 error_msg = f"Repository not found: {full_name}"
                 global_logger.error(error_msg)
                 return ToolResponse(success=False, error=error_msg)
-                
+
             else:
-                error_msg = f"GitHub API error: {response.status_code} - {response.text}"
+                error_msg = f"GitHub API error: {status_code} - {response_text}"
                 global_logger.error(error_msg)
                 return ToolResponse(success=False, error=error_msg)
-                
+
+        except asyncio.TimeoutError:
+            error_msg = "GitHub API request timeout"
+            global_logger.error(error_msg)
+            return ToolResponse(success=False, error=error_msg)
+
+        except aiohttp.ClientError as e:
+            error_msg = f"GitHub API request failed: {str(e)}"
+            global_logger.error(error_msg)
+            return ToolResponse(success=False, error=error_msg)
+
         except Exception as e:
             error_msg = f"GitHub repository info error: {str(e)}"
             global_logger.error(error_msg)
-            return ToolResponse(success=False, error=error_msg) 
\ No newline at end of file
+            return ToolResponse(success=False, error=error_msg)
+
+    async def execute_many(self, task_id: str, workspace_path, full_names: List[str],
+                          token: Optional[str] = None, **kwargs) -> ToolResponse:
+        """并发获取多个仓库的详细信息
+
+        N个仓库的请求经Semaphore(10)限流后并发发出，共享同一个
+        连接池，总延迟从N×RTT降到约1×RTT。
+
+        Args:
+            task_id: 任务ID
+            full_names: 仓库全名列表（如 ["owner/repo", ...]）
+            token: GitHub Token（可选）
+
+        Returns:
+            ToolResponse: data.results为逐仓库的结果列表
+        """
+        try:
+            if not full_names:
+                return ToolResponse(success=False, error="full_names is required")
+
+            global_logger.info(f"Getting repository info for {len(full_names)} repositories")
+
+            # 批量大时走GraphQL：一次POST拿全部仓库，只扣1个配额点；
+            # 失败（如token无GraphQL权限）则退回REST并发路径
+            if len(full_names) > 3:
+                try:
+                    github_token = self._get_github_token(token)
+                    results = await self._graphql_repos(full_names, github_token)
+                    succeeded = sum(1 for r in results if r['success'])
+                    return ToolResponse(
+                        success=True,
+                        data={
+                            'total': len(full_names),
+                            'succeeded': succeeded,
+                            'results': results
+                        }
+                    )
+                except Exception as e:
+                    global_logger.warning(f"GraphQL batch failed, falling back to REST: {str(e)}")
+
+            sem = asyncio.Semaphore(10)
+
+            async def one(full_name: str) -> ToolResponse:
+                async with sem:
+                    return await self.execute(task_id, workspace_path, full_name, token=token)
+
+            responses = await asyncio.gather(
+                *(one(fn) for fn in full_names), return_exceptions=True
+            )
+
+            results = []
+            succeeded = 0
+            for full_name, resp in zip(full_names, responses):
+                if isinstance(resp, BaseException):
+                    results.append({'full_name': full_name, 'success': False, 'error': str(resp)})
+                elif resp.success:
+                    succeeded += 1
+                    results.append({'full_name': full_name, 'success': True, 'data': resp.data})
+                else:
+                    results.append({'full_name': full_name, 'success': False, 'error': resp.error})
+
+            return ToolResponse(
+                success=True,
+                data={
+                    'total': len(full_names),
+                    'succeeded': succeeded,
+                    'results': results
+                }
+            )
+
+        except Exception as e:
+            error_msg = f"GitHub batch repository info error: {str(e)}"
+            global_logger.error(error_msg)
+            return ToolResponse(success=False, error=error_msg)
+
+    async def _graphql_repos(self, full_names: List[str], github_token: str) -> List[Dict[str, Any]]:
+        """用一次GraphQL查询批量拉取仓库元数据
+
+        N个repository(owner, name)字段在同一查询里用别名r0..rN-1
+        展开，结果整形成REST路径相同的结构并写入TTL缓存。
+        """
+        aliases = []
+        query_parts = []
+        for full_name in full_names:
+            owner, _, name = full_name.partition('/')
+            if not owner or not name or '/' in name:
+                aliases.append(None)
+                continue
+            alias = f"r{len(query_parts)}"
+            aliases.append(alias)
+            query_parts.append(
+                f"{alias}: repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) {{ ...RepoFields }}"
+            )
+
+        data = {}
+        if query_parts:
+            query = "query {\n" + "\n".join(query_parts) + "\n}\n" + _GRAPHQL_REPO_FRAGMENT
+            headers = self._get_headers(github_token)
+            session = await _get_session()
+            async with session.post(f"{self.base_url}/graphql", json={'query': query},
+                                    headers=headers,
+                                    timeout=aiohttp.ClientTimeout(total=30)) as response:
+                if response.status != 200:
+                    raise RuntimeError(
+                        f"GitHub GraphQL error: {response.status} - {await response.text()}"
+                    )
+                payload = _json_loads(await response.read())
+            data = payload.get('data') or {}
+
+        results = []
+        for full_name, alias in zip(full_names, aliases):
+            node = data.get(alias) if alias else None
+            if node is None:
+                results.append({
+                    'full_name': full_name,
+                    'success': False,
+                    'error': f"Repository not found: {full_name}"
+                })
+            else:
+                repo_info = _format_graphql_repo(node)
+                _repo_cache_put(full_name, repo_info)
+                results.append({'full_name': full_name, 'success': True, 'data': repo_info})
+        return results
\ No newline at end of file
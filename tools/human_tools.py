@@ -18,7 +18,18 @@ class HumanInLoopTool(LocalTool):
         self._human_task_manager: Optional[HumanTaskManager] = None
     
     def _get_human_task_manager(self, workspace_path: Path) -> HumanTaskManager:
-        """获取人类任务管理器实例"""
+        """获取人类任务管理器实例
+
+        优先复用服务器的全局实例：完成信号由HTTP端点经同一个
+        manager推送，工具才能被即时唤醒而不是等兜底轮询。
+        """
+        if self._human_task_manager is None:
+            try:
+                from core.server import server_instance
+                if server_instance is not None and server_instance.human_task_manager is not None:
+                    self._human_task_manager = server_instance.human_task_manager
+            except ImportError:
+                pass
         if self._human_task_manager is None:
             self._human_task_manager = HumanTaskManager(workspace_path)
         return self._human_task_manager
@@ -34,7 +45,7 @@ class HumanInLoopTool(LocalTool):
             human_task: 人类任务描述
             workspace_path: 工作空间路径
             timeout: 超时时间（秒），None 表示无限等待
-            check_interval: 检查间隔（秒）
+            check_interval: 检查间隔（秒），检查为非阻塞，等待期间不占用事件循环
             
         Returns:
             ToolResponse: 执行结果
@@ -49,8 +60,10 @@ class HumanInLoopTool(LocalTool):
             # 获取人类任务管理器
             human_task_manager = self._get_human_task_manager(workspace_path)
             
-            # 创建人类任务
-            human_task_id = human_task_manager.create_human_task(task_id, human_task.strip())
+            # 创建人类任务（文件写入进线程池）
+            human_task_id = await asyncio.to_thread(
+                human_task_manager.create_human_task, task_id, human_task.strip()
+            )
             
             global_logger.info(f"Created human task {human_task_id}, waiting for completion...")
             
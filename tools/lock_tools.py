@@ -1,12 +1,23 @@
 import asyncio
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 from tools.base_tool import LocalTool
 from utils.response import ToolResponse
 from utils.lock_manager import LockManager, FileLock, get_global_lock_manager
 from utils.lock_decorator import bypass_lock_check
+from datetime import datetime
 import time
 
+# 时间格式串构建一次复用；datetime.fromtimestamp+strftime一次调用
+# 比time.localtime+time.strftime两次C调用更省
+_LOCKED_AT_FMT = "%Y-%m-%d %H:%M:%S"
+
+
+def _format_locked_at(locked_at: float) -> str:
+    """把锁时间戳转成人类可读格式"""
+    return datetime.fromtimestamp(locked_at).strftime(_LOCKED_AT_FMT)
+
 class FileLockTool(LocalTool):
     """文件锁定工具"""
     
@@ -15,6 +26,13 @@ class FileLockTool(LocalTool):
         self.tool_name = "file_lock"
         self.description = "锁定文件或目录，防止其他操作修改。支持等级制锁定系统"
         self.version = "1.0.0"
+        self._lock_manager = None
+
+    def _get_lock_manager(self):
+        """获取LockManager实例（首次取到后缓存在实例上，省去每次调用的全局查找）"""
+        if self._lock_manager is None:
+            self._lock_manager = get_global_lock_manager()
+        return self._lock_manager
     
     @bypass_lock_check
     async def execute(self, task_id: str, workspace_path: Path, **params) -> ToolResponse:
@@ -53,7 +71,7 @@ class FileLockTool(LocalTool):
                 )
             
             # 获取LockManager实例
-            lock_manager = get_global_lock_manager()
+            lock_manager = self._get_lock_manager()
             if lock_manager is None:
                 return ToolResponse(
                     success=False,
@@ -91,6 +109,13 @@ class FileUnlockTool(LocalTool):
         self.tool_name = "file_unlock"
         self.description = "解锁文件或目录。高等级可无条件解锁低等级，同等级需要提供正确的上锁者名称"
         self.version = "1.0.0"
+        self._lock_manager = None
+
+    def _get_lock_manager(self):
+        """获取LockManager实例（首次取到后缓存在实例上，省去每次调用的全局查找）"""
+        if self._lock_manager is None:
+            self._lock_manager = get_global_lock_manager()
+        return self._lock_manager
     
     @bypass_lock_check
     async def execute(self, task_id: str, workspace_path: Path, **params) -> ToolResponse:
@@ -129,7 +154,7 @@ class FileUnlockTool(LocalTool):
                 )
             
             # 获取LockManager实例
-            lock_manager = get_global_lock_manager()
+            lock_manager = self._get_lock_manager()
             if lock_manager is None:
                 return ToolResponse(
                     success=False,
@@ -167,6 +192,13 @@ class ListLocksTool(LocalTool):
         self.tool_name = "list_locks"
         self.description = "列出当前所有文件锁或特定任务的文件锁"
         self.version = "1.0.0"
+        self._lock_manager = None
+
+    def _get_lock_manager(self):
+        """获取LockManager实例（首次取到后缓存在实例上，省去每次调用的全局查找）"""
+        if self._lock_manager is None:
+            self._lock_manager = get_global_lock_manager()
+        return self._lock_manager
     
     @bypass_lock_check
     async def execute(self, task_id: str, workspace_path: Path, **params) -> ToolResponse:
@@ -182,7 +214,7 @@ class ListLocksTool(LocalTool):
             show_all = params.get('show_all', False)
             
             # 获取LockManager实例
-            lock_manager = get_global_lock_manager()
+            lock_manager = self._get_lock_manager()
             if lock_manager is None:
                 return ToolResponse(
                     success=False,
@@ -197,18 +229,18 @@ class ListLocksTool(LocalTool):
                 locks = lock_manager.list_locks(filter_task_id)
             
             # 格式化锁信息
-            locks_data = []
-            for lock in locks:
-                lock_info = {
+            locks_data = [
+                {
                     "path": lock.path,
                     "level": lock.level,
                     "locker_name": lock.locker_name,
                     "task_id": lock.task_id,
-                    "locked_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(lock.locked_at)),
+                    "locked_at": _format_locked_at(lock.locked_at),
                     "locked_at_timestamp": lock.locked_at
                 }
-                locks_data.append(lock_info)
-            
+                for lock in locks
+            ]
+
             return ToolResponse(
                 success=True,
                 error=None,
@@ -230,12 +262,25 @@ class ListLocksTool(LocalTool):
 
 class CheckLockTool(LocalTool):
     """检查文件锁状态工具"""
-    
+
+    # check_access结果的短TTL缓存参数：吸收同一路径的密集重复检查
+    _CHECK_CACHE_MAX = 1024
+    _CHECK_CACHE_TTL = 0.5
+
     def __init__(self):
         super().__init__()
         self.tool_name = "check_lock"
         self.description = "检查特定文件或目录的锁状态"
         self.version = "1.0.0"
+        self._lock_manager = None
+        # (file_path, task_id) -> (过期时刻, (can_access, lock_info))
+        self._check_cache: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+
+    def _get_lock_manager(self):
+        """获取LockManager实例（首次取到后缓存在实例上，省去每次调用的全局查找）"""
+        if self._lock_manager is None:
+            self._lock_manager = get_global_lock_manager()
+        return self._lock_manager
     
     @bypass_lock_check
     async def execute(self, task_id: str, workspace_path: Path, **params) -> ToolResponse:
@@ -256,7 +301,7 @@ class CheckLockTool(LocalTool):
                 )
             
             # 获取LockManager实例
-            lock_manager = get_global_lock_manager()
+            lock_manager = self._get_lock_manager()
             if lock_manager is None:
                 return ToolResponse(
                     success=False,
@@ -264,8 +309,19 @@ class CheckLockTool(LocalTool):
                     data={}
                 )
             
-            # 检查访问权限
-            can_access, lock_info = lock_manager.check_access(file_path, task_id)
+            # 检查访问权限（短TTL内重复检查直接复用结果）
+            cache_key = (file_path, task_id)
+            now = time.monotonic()
+            cached = self._check_cache.get(cache_key)
+            if cached is not None and now < cached[0]:
+                self._check_cache.move_to_end(cache_key)
+                can_access, lock_info = cached[1]
+            else:
+                can_access, lock_info = lock_manager.check_access(file_path, task_id)
+                self._check_cache[cache_key] = (now + self._CHECK_CACHE_TTL, (can_access, lock_info))
+                self._check_cache.move_to_end(cache_key)
+                while len(self._check_cache) > self._CHECK_CACHE_MAX:
+                    self._check_cache.popitem(last=False)
             
             result_data = {
                 "file_path": file_path,
@@ -279,7 +335,7 @@ class CheckLockTool(LocalTool):
                     "level": lock_info.level,
                     "locker_name": lock_info.locker_name,
                     "task_id": lock_info.task_id,
-                    "locked_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(lock_info.locked_at)),
+                    "locked_at": _format_locked_at(lock_info.locked_at),
                     "locked_at_timestamp": lock_info.locked_at
                 }
             
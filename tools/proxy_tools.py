@@ -1,38 +1,133 @@
+import json
 import httpx
+import time
+import socket
 import asyncio
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from utils.response import ToolResponse
 from utils.logger import global_logger
 
+# orjson解析代理响应体比stdlib快数倍（C实现），没装则退回stdlib
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+
+def _json_loads(raw: bytes) -> Any:
+    """解析响应体字节（优先orjson）"""
+    if _orjson is not None:
+        return _orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _socket_options() -> List[Tuple[int, int, int]]:
+    """代理连接的socket参数：小JSON报文关Nagle免~40ms合包延迟，
+    开TCP keepalive让池中空闲连接不被中间设备悄悄掐断，
+    加大收发缓冲让多MB响应体不受默认窗口限速"""
+    options = [
+        (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+        (socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024),
+        (socket.SOL_SOCKET, socket.SO_SNDBUF, 4 * 1024 * 1024),
+    ]
+    if hasattr(socket, 'TCP_KEEPIDLE'):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 30))
+    return options
+
 
 class ProxyTools:
     """通用工具代理服务（代理远程工具服务器）"""
     
-    def __init__(self, proxy_base_url: str = "http://localhost:8892", timeout: float = 120.0):
+    def __init__(self, proxy_base_url: str = "http://localhost:8892", timeout: float = 120.0,
+                 discovery_ttl: float = 30.0, batch_window: float = 0.005,
+                 max_batch: int = 32, neg_cache_ttl: float = 60.0):
         """
         初始化ProxyTools
-        
+
         Args:
             proxy_base_url: 代理服务的基础URL，格式为 http://host:port
             timeout: 请求超时时间（秒）
+            discovery_ttl: 工具发现结果的缓存时长（秒），期间重复发现不发网络请求
+            batch_window: 合批窗口（秒），窗口内到达的调用合成一次批量请求
+            max_batch: 单批最大请求数，攒够即刻发出不等窗口
+            neg_cache_ttl: 负缓存时长（秒），缓存404/工具不存在类失败免重复往返
         """
         self.proxy_base_url = proxy_base_url.rstrip('/')
         self.timeout = timeout
-        self.client = httpx.AsyncClient(timeout=timeout)
-        self.available_tools = set()
+        # 加大连接池并设keepalive过期：大量并发代理调用复用少数连接，
+        # 免去每次调用的TCP/TLS握手；HTTP/2多路复用进一步摊薄连接数
+        # （需要h2包，没装则退回HTTP/1.1）
+        limits = httpx.Limits(
+            max_connections=200,
+            max_keepalive_connections=50,
+            keepalive_expiry=60.0
+        )
+        # 拆分超时：连接/写/取池用短超时快速暴露瞬时故障，
+        # read才用长的timeout容纳慢工具执行
+        timeout_config = httpx.Timeout(connect=3.0, read=timeout, write=10.0, pool=5.0)
+        self.client = self._build_client(limits, timeout_config)
+        # 不可变快照做O(1)成员检查；发现结果按TTL缓存避免重复网络往返
+        self.available_tools: frozenset = frozenset()
+        self.discovery_ttl = discovery_ttl
+        self._discovered_tools: List[str] = []
+        self._last_discovery_ts = 0.0
+        # 合批状态：窗口内积攒的(请求体, future)与定时冲刷任务
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        # 负缓存：(tool_name, 规范化参数) -> (过期时刻, 失败响应)，
+        # 对已知不存在的工具/404重复调用直接返回不打网络
+        self.neg_cache_ttl = neg_cache_ttl
+        self._neg_cache: Dict[Tuple[str, str], Tuple[float, ToolResponse]] = {}
         global_logger.info(f"ProxyTools initialized with proxy service at {self.proxy_base_url}")
-    
-    async def discover_proxy_tools(self) -> List[str]:
-        """发现代理服务器上可用的工具"""
+
+    def _build_client(self, limits: httpx.Limits, timeout_config: httpx.Timeout) -> httpx.AsyncClient:
+        """构建AsyncClient：带socket调优的transport，HTTP/2需要h2包，
+        没装则退回HTTP/1.1；旧版httpx不支持socket_options时退回默认transport"""
+        for http2 in (True, False):
+            try:
+                transport = httpx.AsyncHTTPTransport(
+                    retries=1,
+                    limits=limits,
+                    http2=http2,
+                    socket_options=_socket_options()
+                )
+                return httpx.AsyncClient(
+                    base_url=self.proxy_base_url,
+                    timeout=timeout_config,
+                    transport=transport
+                )
+            except ImportError:
+                # h2未安装，降级到HTTP/1.1重试
+                continue
+            except TypeError:
+                break
+        return httpx.AsyncClient(
+            base_url=self.proxy_base_url,
+            timeout=timeout_config,
+            limits=limits
+        )
+
+    async def discover_proxy_tools(self, force: bool = False) -> List[str]:
+        """发现代理服务器上可用的工具（TTL内复用上次结果）"""
+        # TTL内的重复发现直接返回缓存，省一次网络往返
+        if (not force and self._discovered_tools
+                and time.monotonic() - self._last_discovery_ts < self.discovery_ttl):
+            return list(self._discovered_tools)
+
         try:
-            url = f"{self.proxy_base_url}/api/tools"
+            url = "/api/tools"
             response = await self.client.get(url)
-            
+
             if response.status_code == 200:
-                result = response.json()
+                result = _json_loads(response.content)
                 if result.get("success"):
                     tools = result.get("data", [])
-                    self.available_tools = set(tools)
+                    self.available_tools = frozenset(tools)
+                    self._discovered_tools = list(tools)
+                    self._last_discovery_ts = time.monotonic()
                     global_logger.info(f"Discovered {len(tools)} proxy tools: {tools}")
                     return tools
                 else:
@@ -46,41 +141,136 @@ class ProxyTools:
             global_logger.error(f"Failed to discover proxy tools: {str(e)}")
             return []
     
-    async def execute_proxy_tool(self, task_id: str, tool_name: str, params: Dict[str, Any]) -> ToolResponse:
+    async def execute_proxy_tool(self, task_id: str, tool_name: str, params: Dict[str, Any],
+                                 no_batch: bool = False) -> ToolResponse:
         """
         执行代理工具
-        
+
+        默认经合批窗口发送：同一窗口内到达的调用合成一次
+        /api/tool/execute_batch请求，把N个往返摊成1个；
+        no_batch=True时直接走单发路径。
+
         Args:
             task_id: 任务ID
             tool_name: 工具名称
             params: 工具参数（不包含task_id）
-            
+            no_batch: 跳过合批，立刻单发
+
         Returns:
             ToolResponse: 代理服务器的响应
         """
+        # 构建请求体，完全按照本地格式
+        request_data = {
+            "task_id": task_id,
+            "tool_name": tool_name,
+            "params": params
+        }
+
+        global_logger.debug(f"Proxying tool {tool_name} to {self.proxy_base_url}")
+
+        # 负缓存命中：已知失败的(工具, 参数)组合在TTL内直接返回
+        neg_key = (tool_name, json.dumps(params, sort_keys=True, default=str))
+        cached = self._neg_cache.get(neg_key)
+        if cached is not None:
+            expiry, cached_response = cached
+            if time.monotonic() < expiry:
+                global_logger.debug(f"Negative cache hit for proxy tool {tool_name}")
+                return cached_response
+            del self._neg_cache[neg_key]
+
+        if no_batch or self.max_batch <= 1:
+            result = await self._post_single(request_data)
+            self._maybe_cache_negative(neg_key, result)
+            return result
+
+        fut = asyncio.get_running_loop().create_future()
+        self._pending.append((request_data, fut))
+
+        if len(self._pending) >= self.max_batch:
+            # 攒够一批：取消窗口定时器，立刻冲刷
+            if self._flush_task is not None:
+                self._flush_task.cancel()
+                self._flush_task = None
+            asyncio.ensure_future(self._flush())
+        elif self._flush_task is None:
+            self._flush_task = asyncio.ensure_future(self._flush_after_window())
+
+        result = await fut
+        self._maybe_cache_negative(neg_key, result)
+        return result
+
+    def _maybe_cache_negative(self, neg_key: Tuple[str, str], result: ToolResponse):
+        """失败响应中404/工具不存在类错误进负缓存"""
+        if self.neg_cache_ttl <= 0 or result.success or not result.error:
+            return
+        error_lower = result.error.lower()
+        if "404" in error_lower or "not found" in error_lower or "unknown tool" in error_lower:
+            self._neg_cache[neg_key] = (time.monotonic() + self.neg_cache_ttl, result)
+
+    async def _flush_after_window(self):
+        """等一个合批窗口后冲刷积攒的请求"""
         try:
-            url = f"{self.proxy_base_url}/api/tool/execute"
-            
-            # 构建请求体，完全按照本地格式
-            request_data = {
-                "task_id": task_id,
-                "tool_name": tool_name,
-                "params": params
-            }
-            
-            global_logger.debug(f"Proxying tool {tool_name} to {url}")
-            
+            await asyncio.sleep(self.batch_window)
+        except asyncio.CancelledError:
+            return
+        await self._flush()
+
+    async def _flush(self):
+        """把积攒的请求发出去并按序回填future"""
+        pending, self._pending = self._pending, []
+        self._flush_task = None
+        if not pending:
+            return
+
+        # 只有一个请求就走单发端点，不付批量封包开销
+        if len(pending) == 1:
+            request_data, fut = pending[0]
+            result = await self._post_single(request_data)
+            if not fut.done():
+                fut.set_result(result)
+            return
+
+        try:
+            response = await self.client.post(
+                "/api/tool/execute_batch",
+                json={"requests": [request_data for request_data, _ in pending]}
+            )
+            if response.status_code == 200:
+                results = _json_loads(response.content).get("responses", [])
+                if len(results) == len(pending):
+                    for (_, fut), result in zip(pending, results):
+                        if not fut.done():
+                            fut.set_result(ToolResponse(**result))
+                    return
+            global_logger.warning(
+                f"Batch proxy execution degraded ({response.status_code}), falling back to single calls"
+            )
+        except Exception as e:
+            # 旧版后端没有batch端点等情况：退回逐个单发
+            global_logger.warning(f"Batch proxy execution failed, falling back to single calls: {str(e)}")
+
+        results = await asyncio.gather(*(self._post_single(request_data) for request_data, _ in pending))
+        for (_, fut), result in zip(pending, results):
+            if not fut.done():
+                fut.set_result(result)
+
+    async def _post_single(self, request_data: Dict[str, Any]) -> ToolResponse:
+        """单发一个代理工具请求"""
+        tool_name = request_data.get("tool_name")
+        try:
+            url = "/api/tool/execute"
+
             response = await self.client.post(url, json=request_data)
             
             if response.status_code == 200:
-                result = response.json()
+                result = _json_loads(response.content)
                 # 直接返回代理服务器的响应，不做任何转换
                 return ToolResponse(**result)
             else:
                 error_msg = f"Proxy tool execution failed: {response.status_code}"
                 if response.text:
                     try:
-                        error_detail = response.json()
+                        error_detail = _json_loads(response.content)
                         error_msg += f" - {error_detail.get('error', response.text)}"
                     except:
                         error_msg += f" - {response.text}"
@@ -104,7 +294,7 @@ class ProxyTools:
     async def health_check(self) -> bool:
         """检查代理服务器健康状态"""
         try:
-            url = f"{self.proxy_base_url}/health"
+            url = "/health"
             response = await self.client.get(url, timeout=10.0)
             return response.status_code == 200
         except Exception as e:
@@ -114,11 +304,11 @@ class ProxyTools:
     async def get_proxy_info(self) -> Dict[str, Any]:
         """获取代理服务器信息"""
         try:
-            url = f"{self.proxy_base_url}/"
+            url = "/"
             response = await self.client.get(url)
             
             if response.status_code == 200:
-                return response.json()
+                return _json_loads(response.content)
             else:
                 return {"error": f"Failed to get proxy info: {response.status_code}"}
                 
@@ -128,6 +318,12 @@ class ProxyTools:
     def is_proxy_tool(self, tool_name: str) -> bool:
         """检查工具是否为代理工具"""
         return tool_name in self.available_tools
+
+    def invalidate_cache(self):
+        """失效发现缓存与负缓存，下次discover_proxy_tools强制走网络"""
+        self._last_discovery_ts = 0.0
+        self._discovered_tools = []
+        self._neg_cache.clear()
     
     async def __aenter__(self):
         return self
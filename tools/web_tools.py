@@ -1,7 +1,14 @@
 import re
 import os
+import json
+import time
+import hashlib
+import asyncio
+import aiohttp
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Tuple
 from urllib.parse import urlparse, urlencode
 from .base_tool import LocalTool
 from utils.response import ToolResponse
@@ -20,6 +27,149 @@ try:
 except ImportError:
     AsyncWebCrawler = None
 
+# 模块级共享爬虫：无头浏览器启动要数百毫秒到秒级，
+# 启动一次后跨调用/跨页复用，多页抓取从N次启动降到1次
+_crawler = None
+_crawler_lock = asyncio.Lock()
+
+
+async def _get_crawler():
+    """懒启动共享AsyncWebCrawler"""
+    global _crawler
+    if _crawler is None:
+        async with _crawler_lock:
+            if _crawler is None:
+                crawler = AsyncWebCrawler(
+                    config=BrowserConfig(headless=True, verbose=False)
+                )
+                await crawler.__aenter__()
+                _crawler = crawler
+    return _crawler
+
+
+async def close_crawler():
+    """关闭共享爬虫（服务停机时调用）"""
+    global _crawler
+    if _crawler is not None:
+        await _crawler.__aexit__(None, None, None)
+        _crawler = None
+
+
+# 模块级共享HTTP session：图片等直连下载复用连接池，
+# 同一CDN的多张图片共享TCP/TLS握手
+_http_session: Optional[aiohttp.ClientSession] = None
+_http_session_lock = asyncio.Lock()
+
+
+async def _get_http_session() -> aiohttp.ClientSession:
+    """懒初始化共享ClientSession"""
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        async with _http_session_lock:
+            if _http_session is None or _http_session.closed:
+                connector = aiohttp.TCPConnector(
+                    limit=32, limit_per_host=16, keepalive_timeout=60
+                )
+                _http_session = aiohttp.ClientSession(connector=connector)
+    return _http_session
+
+
+async def close_http_session():
+    """关闭共享HTTP session（服务停机时调用）"""
+    global _http_session
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+    _http_session = None
+
+
+# 图片下载的流式读块大小：64KB块在吞吐和单块延迟间取平衡
+_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# 预编译的markdown图片与文件名清理正则（避免每次调用重查正则缓存）
+_IMG_MD_RE = re.compile(r"!\[[^\]]*\]\(([^\)]+)\)")
+_SAFE_QUERY_STRIP_RE = re.compile(r'[^\w\s-]')
+_SAFE_QUERY_SEP_RE = re.compile(r'[-\s]+')
+
+
+# Scholar页面磁盘缓存：无头浏览器+Google限频端点是全库最贵的资源，
+# TTL内重复搜索直接读盘
+_SCHOLAR_CACHE_TTL = 3600.0
+_SCHOLAR_CACHE_MAX_BYTES = 500 * 1024 * 1024
+
+
+def _scholar_cache_path(cache_root: Path, query: str, year_low: Optional[int],
+                        year_high: Optional[int], page: int) -> Path:
+    """按规范化参数生成缓存条目路径（两级目录避免单目录过大）"""
+    key = hashlib.sha256(json.dumps(
+        {"q": query, "yl": year_low, "yh": year_high, "p": page},
+        sort_keys=True
+    ).encode()).hexdigest()
+    return cache_root / key[:2] / key
+
+
+def _scholar_cache_get(entry: Path, ttl: float) -> Optional[str]:
+    """读取未过期的缓存条目（在线程中执行），没有或过期返回None"""
+    try:
+        if entry.exists() and time.time() - entry.stat().st_mtime <= ttl:
+            return entry.read_text(encoding='utf-8')
+    except OSError:
+        pass
+    return None
+
+
+def _scholar_cache_put(cache_root: Path, entry: Path, content: str):
+    """写入缓存条目并在超出容量上限时按mtime淘汰最旧条目"""
+    try:
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        entry.write_text(content, encoding='utf-8')
+        _scholar_cache_evict(cache_root, _SCHOLAR_CACHE_MAX_BYTES)
+    except OSError:
+        pass
+
+
+def _scholar_cache_evict(cache_root: Path, max_bytes: int):
+    """总大小超过上限时删除最旧的缓存文件直到回到上限内"""
+    entries = []
+    total = 0
+    for dirpath, _, filenames in os.walk(cache_root):
+        for name in filenames:
+            file_path = os.path.join(dirpath, name)
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, file_path))
+            total += st.st_size
+    if total <= max_bytes:
+        return
+    entries.sort()
+    for _, size, file_path in entries:
+        try:
+            os.unlink(file_path)
+        except OSError:
+            continue
+        total -= size
+        if total <= max_bytes:
+            break
+
+
+def _write_markdown_chunks(md_path: Path, header: str, chunks: List[str]):
+    """把多段markdown逐段写入文件（在线程中执行），免去拼接大字符串"""
+    with open(md_path, 'w', encoding='utf-8') as f:
+        f.write(header)
+        for i, chunk in enumerate(chunks):
+            if i:
+                f.write("\n\n---\n\n")
+            f.write(chunk)
+
+
+@dataclass(slots=True)
+class SearchHit:
+    """单条Google搜索结果（slots实例比逐条dict省分配）"""
+    title: str
+    url: str
+    description: str
+
 
 class GoogleSearchTool(LocalTool):
     """Google搜索工具"""
@@ -42,20 +192,21 @@ class GoogleSearchTool(LocalTool):
             
             global_logger.info(f"Google 搜索: {query}, 结果数量: {num_results}")
             
-            # 执行搜索
-            results = []
-            for res in google_search(query, num_results=num_results, advanced=True):
-                results.append({
-                    "title": getattr(res, "title", ""),
-                    "url": getattr(res, "url", ""),
-                    "description": getattr(res, "description", "")
-                })
-            
+            # 执行搜索（收集为slots实例，返回时才转dict序列化）
+            results = [
+                SearchHit(
+                    getattr(res, "title", ""),
+                    getattr(res, "url", ""),
+                    getattr(res, "description", "")
+                )
+                for res in google_search(query, num_results=num_results, advanced=True)
+            ]
+
             return ToolResponse(
                 success=True,
                 data={
                     "query": query,
-                    "results": results,
+                    "results": [asdict(hit) for hit in results],
                     "total_results": len(results)
                 }
             )
@@ -67,12 +218,36 @@ class GoogleSearchTool(LocalTool):
 
 class CrawlPageTool(LocalTool):
     """网页爬取工具"""
-    
+
+    # URL负缓存参数：近期爬取失败的URL在TTL内直接返回失败，不再起爬
+    _NEG_CACHE_MAX = 256
+    _NEG_CACHE_TTL = 60.0
+
     def __init__(self):
         super().__init__()
         self.tool_name = "crawl_page"
         self.description = "爬取指定URL的页面内容"
-    
+        self._neg_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    def _neg_cache_get(self, url: str) -> Optional[str]:
+        """取未过期的失败记录，没有返回None"""
+        entry = self._neg_cache.get(url)
+        if entry is None:
+            return None
+        expiry, error = entry
+        if time.monotonic() >= expiry:
+            del self._neg_cache[url]
+            return None
+        self._neg_cache.move_to_end(url)
+        return error
+
+    def _neg_cache_put(self, url: str, error: str):
+        """记录失败URL，LRU限容"""
+        self._neg_cache[url] = (time.monotonic() + self._NEG_CACHE_TTL, error)
+        self._neg_cache.move_to_end(url)
+        while len(self._neg_cache) > self._NEG_CACHE_MAX:
+            self._neg_cache.popitem(last=False)
+
     @require_write_access('output_dir')
     async def execute(self, task_id: str, workspace_path: Path, url: str, output_dir: str = 'crawled_content', download_images: bool = False, **kwargs) -> ToolResponse:
         try:
@@ -84,7 +259,12 @@ class CrawlPageTool(LocalTool):
             
             if not url:
                 return ToolResponse(success=False, error="url is required")
-            
+
+            cached_error = self._neg_cache_get(url)
+            if cached_error is not None:
+                global_logger.info(f"页面负缓存命中，跳过爬取: {url}")
+                return ToolResponse(success=False, error=cached_error)
+
             global_logger.info(f"爬取页面: {url}")
             
             # 构建输出目录
@@ -92,20 +272,19 @@ class CrawlPageTool(LocalTool):
             full_output_dir = task_path / "upload" / output_dir
             full_output_dir.mkdir(parents=True, exist_ok=True)
             
-            # 使用 Crawl4AI 爬取页面
+            # 使用 Crawl4AI 爬取页面（共享浏览器实例，免去每次启动）
             async def _async_crawl():
-                browser_conf = BrowserConfig(headless=True, verbose=False)
                 run_conf = CrawlerRunConfig(cache_mode=CacheMode.BYPASS)
-                async with AsyncWebCrawler(config=browser_conf) as crawler:
-                    result = await crawler.arun(url, config=run_conf)
-                    return result
-            
+                crawler = await _get_crawler()
+                return await crawler.arun(url, config=run_conf)
+
             result = await _async_crawl()
             
             markdown_attr = getattr(result, "markdown", None)
             if markdown_attr is None:
+                self._neg_cache_put(url, "无法从爬取结果中获取 Markdown")
                 return ToolResponse(
-                    success=False, 
+                    success=False,
                     error="无法从爬取结果中获取 Markdown"
                 )
             
@@ -117,53 +296,24 @@ class CrawlPageTool(LocalTool):
             if download_images:
                 images_dir = full_output_dir / "images"
                 images_dir.mkdir(exist_ok=True)
-                
-                def _download_image(img_url: str) -> str:
-                    """下载图片并返回本地路径"""
-                    try:
-                        import requests
-                        resp = requests.get(img_url, timeout=15)
-                        resp.raise_for_status()
-                        
-                        # 检查是否为图片
-                        if not resp.headers.get("content-type", "").startswith("image"):
-                            return img_url
-                        
-                        # 生成文件名
-                        filename = os.path.basename(urlparse(img_url).path) or "image"
-                        if "." not in filename:
-                            mime_ext = resp.headers.get("content-type", "image/png").split("/")[-1]
-                            filename = f"{filename}.{mime_ext}"
-                        
-                        local_path = images_dir / filename
-                        counter = 1
-                        while local_path.exists():
-                            stem = local_path.stem
-                            suffix = local_path.suffix
-                            local_path = images_dir / f"{stem}_{counter}{suffix}"
-                            counter += 1
-                        
-                        local_path.write_bytes(resp.content)
-                        return str(local_path.relative_to(full_output_dir))
-                        
-                    except Exception as e:
-                        global_logger.warning(f"图片下载失败: {img_url} -> {e}")
-                        return img_url
-                
-                # 替换图片链接
+
+                # 先提取全部图片URL并发下载，再按映射替换链接：
+                # M张图片的耗时从各RTT之和降到约最慢一张
+                img_urls = _IMG_MD_RE.findall(markdown_text)
+                url_map = await self._download_images(img_urls, images_dir, full_output_dir)
+
                 def _replace_image(match):
                     img_url = match.group(1)
-                    local_path = _download_image(img_url)
-                    return match.group(0).replace(img_url, local_path)
-                
-                markdown_text = re.sub(r"!\[[^\]]*\]\(([^\)]+)\)", _replace_image, markdown_text)
+                    return match.group(0).replace(img_url, url_map.get(img_url, img_url))
+
+                markdown_text = _IMG_MD_RE.sub(_replace_image, markdown_text)
             else:
                 # 移除图片标记
-                markdown_text = re.sub(r"!\[[^\]]*\]\([^\)]+\)", "", markdown_text)
+                markdown_text = _IMG_MD_RE.sub("", markdown_text)
             
-            # 保存 Markdown 文件
+            # 保存 Markdown 文件（放线程池，大文档写盘不阻塞事件循环）
             md_path = full_output_dir / "content.md"
-            md_path.write_text(markdown_text, encoding="utf-8")
+            await asyncio.to_thread(md_path.write_text, markdown_text, encoding="utf-8")
             
             return ToolResponse(
                 success=True,
@@ -178,8 +328,87 @@ class CrawlPageTool(LocalTool):
             
         except Exception as e:
             global_logger.error(f"页面爬取错误: {str(e)}")
+            self._neg_cache_put(url, str(e))
             return ToolResponse(success=False, error=str(e))
 
+    async def _download_images(self, img_urls: list, images_dir: Path,
+                               full_output_dir: Path) -> dict:
+        """并发下载图片，返回 原URL -> 本地相对路径 的映射（失败保留原URL）"""
+        unique_urls = list(dict.fromkeys(img_urls))
+        if not unique_urls:
+            return {}
+
+        session = await _get_http_session()
+        # 限并发防止连接风暴；文件名分配加锁避免并发撞名
+        sem = asyncio.Semaphore(16)
+        name_lock = asyncio.Lock()
+
+        async def one(img_url: str) -> str:
+            async with sem:
+                return await self._download_image(session, img_url, images_dir,
+                                                  full_output_dir, name_lock)
+
+        results = await asyncio.gather(*(one(u) for u in unique_urls), return_exceptions=True)
+
+        url_map = {}
+        for img_url, result in zip(unique_urls, results):
+            if isinstance(result, BaseException):
+                global_logger.warning(f"图片下载失败: {img_url} -> {result}")
+                url_map[img_url] = img_url
+            else:
+                url_map[img_url] = result
+        return url_map
+
+    async def _download_image(self, session: aiohttp.ClientSession, img_url: str,
+                              images_dir: Path, full_output_dir: Path,
+                              name_lock: asyncio.Lock) -> str:
+        """下载单张图片并返回本地路径（失败返回原URL）"""
+        local_path = None
+        try:
+            async with session.get(img_url, timeout=aiohttp.ClientTimeout(total=15)) as resp:
+                resp.raise_for_status()
+
+                # 检查是否为图片
+                content_type = resp.headers.get("Content-Type", "")
+                if not content_type.startswith("image"):
+                    return img_url
+
+                # 生成文件名
+                filename = os.path.basename(urlparse(img_url).path) or "image"
+                if "." not in filename:
+                    mime_ext = (content_type or "image/png").split("/")[-1]
+                    filename = f"{filename}.{mime_ext}"
+
+                async with name_lock:
+                    local_path = images_dir / filename
+                    counter = 1
+                    while local_path.exists():
+                        stem = local_path.stem
+                        suffix = local_path.suffix
+                        local_path = images_dir / f"{stem}_{counter}{suffix}"
+                        counter += 1
+                    local_path.touch()
+
+                # 分块边收边写：大图不整张驻留内存，写盘放线程池
+                file_obj = await asyncio.to_thread(open, local_path, 'wb')
+                try:
+                    async for chunk in resp.content.iter_chunked(_DOWNLOAD_CHUNK_SIZE):
+                        await asyncio.to_thread(file_obj.write, chunk)
+                finally:
+                    await asyncio.to_thread(file_obj.close)
+
+            return str(local_path.relative_to(full_output_dir))
+
+        except Exception as e:
+            global_logger.warning(f"图片下载失败: {img_url} -> {e}")
+            if local_path is not None:
+                # 清掉下载到一半的残留文件
+                try:
+                    local_path.unlink(missing_ok=True)
+                except OSError:
+                    pass
+            return img_url
+
 
 class GoogleScholarSearchTool(LocalTool):
     """Google Scholar搜索工具"""
@@ -190,7 +419,7 @@ class GoogleScholarSearchTool(LocalTool):
         self.description = "搜索Google Scholar并保存结果"
     
     @require_write_access('output_dir')
-    async def execute(self, task_id: str, workspace_path: Path, query: str, output_dir: str = 'scholar_results', year_low: int = None, year_high: int = None, pages: int = 1, **kwargs) -> ToolResponse:
+    async def execute(self, task_id: str, workspace_path: Path, query: str, output_dir: str = 'scholar_results', year_low: int = None, year_high: int = None, pages: int = 1, cache_ttl: float = _SCHOLAR_CACHE_TTL, **kwargs) -> ToolResponse:
         try:
             if AsyncWebCrawler is None:
                 return ToolResponse(
@@ -209,57 +438,82 @@ class GoogleScholarSearchTool(LocalTool):
             full_output_dir.mkdir(parents=True, exist_ok=True)
             
             # 生成安全的文件名
-            safe_query = re.sub(r'[^\w\s-]', '', query).strip()
-            safe_query = re.sub(r'[-\s]+', '_', safe_query)
+            safe_query = _SAFE_QUERY_STRIP_RE.sub('', query).strip()
+            safe_query = _SAFE_QUERY_SEP_RE.sub('_', safe_query)
             
             base_url = "https://scholar.google.com/scholar"
             all_content = []
             
             async def _crawl_scholar_page(url: str) -> str:
-                """爬取单个 Scholar 页面"""
-                browser_conf = BrowserConfig(headless=True, verbose=False)
+                """爬取单个 Scholar 页面（共享浏览器实例）"""
                 run_conf = CrawlerRunConfig(cache_mode=CacheMode.BYPASS)
-                async with AsyncWebCrawler(config=browser_conf) as crawler:
-                    result = await crawler.arun(url, config=run_conf)
-                    
-                    markdown_attr = getattr(result, "markdown", None)
-                    if markdown_attr is None:
-                        return ""
-                    
-                    markdown_text = (
-                        getattr(markdown_attr, "raw_markdown", None) or str(markdown_attr)
-                    )
-                    
-                    # 移除图片标记
-                    markdown_text = re.sub(r"!\[[^\]]*\]\([^\)]+\)", "", markdown_text)
-                    return markdown_text
+                crawler = await _get_crawler()
+                result = await crawler.arun(url, config=run_conf)
+
+                markdown_attr = getattr(result, "markdown", None)
+                if markdown_attr is None:
+                    return ""
+
+                markdown_text = (
+                    getattr(markdown_attr, "raw_markdown", None) or str(markdown_attr)
+                )
+
+                # 移除图片标记
+                markdown_text = _IMG_MD_RE.sub("", markdown_text)
+                return markdown_text
             
-            # 爬取多页结果
+            # 先构建全部URL，再并发爬取：总耗时从各页之和降到最慢一页
+            urls = []
             for page in range(pages):
-                start = page * 10
-                
                 params = {
-                    "start": str(start),
+                    "start": str(page * 10),
                     "q": query,
                     "as_sdt": "0,5"
                 }
-                
+
                 if year_low:
                     params["as_ylo"] = str(year_low)
                 if year_high:
                     params["as_yhi"] = str(year_high)
-                
-                url = f"{base_url}?{urlencode(params)}"
-                global_logger.info(f"爬取 Google Scholar 第 {page + 1} 页")
-                
-                page_content = await _crawl_scholar_page(url)
+
+                urls.append(f"{base_url}?{urlencode(params)}")
+
+            # Semaphore限流，避免并发过高触发Scholar限频
+            sem = asyncio.Semaphore(4)
+            cache_root = workspace_path / ".scholar_cache"
+
+            async def _crawl_limited(page_index: int, url: str) -> str:
+                # TTL内命中磁盘缓存则不动浏览器也不打Scholar
+                cache_entry = _scholar_cache_path(
+                    cache_root, query, year_low, year_high, page_index
+                )
+                if cache_ttl > 0:
+                    cached = await asyncio.to_thread(_scholar_cache_get, cache_entry, cache_ttl)
+                    if cached is not None:
+                        global_logger.info(f"Google Scholar 第 {page_index + 1} 页命中缓存")
+                        return cached
+                async with sem:
+                    global_logger.info(f"爬取 Google Scholar 第 {page_index + 1} 页")
+                    page_content = await _crawl_scholar_page(url)
+                if page_content and cache_ttl > 0:
+                    await asyncio.to_thread(_scholar_cache_put, cache_root, cache_entry, page_content)
+                return page_content
+
+            page_results = await asyncio.gather(
+                *(_crawl_limited(i, u) for i, u in enumerate(urls)),
+                return_exceptions=True
+            )
+
+            # 按页序收集，失败的页记日志跳过
+            for i, page_content in enumerate(page_results):
+                if isinstance(page_content, BaseException):
+                    global_logger.warning(f"Google Scholar 第 {i + 1} 页爬取失败: {page_content}")
+                    continue
                 if page_content:
-                    all_content.append(f"# 第 {page + 1} 页结果\n\n{page_content}")
+                    all_content.append(f"# 第 {i + 1} 页结果\n\n{page_content}")
             
             # 合并所有内容
             if all_content:
-                final_content = f"# Google Scholar 搜索结果: {query}\n\n" + "\n\n---\n\n".join(all_content)
-                
                 # 生成文件名
                 filename = f"{safe_query}"
                 if year_low or year_high:
@@ -267,8 +521,13 @@ class GoogleScholarSearchTool(LocalTool):
                     filename += year_range
                 filename += ".md"
                 
+                # 逐页写盘（放线程池）：多页Scholar结果可达MB级，
+                # 既不在内存里拼一个大字符串，也不阻塞事件循环
                 md_path = full_output_dir / filename
-                md_path.write_text(final_content, encoding="utf-8")
+                header = f"# Google Scholar 搜索结果: {query}\n\n"
+                await asyncio.to_thread(
+                    _write_markdown_chunks, md_path, header, all_content
+                )
                 
                 return ToolResponse(
                     success=True,
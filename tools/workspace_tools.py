@@ -1,7 +1,9 @@
 import os
 import base64
 import shutil
+import asyncio
 import chardet
+from functools import partial
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple
 from .base_tool import LocalTool
@@ -9,6 +11,127 @@ from utils.response import ToolResponse
 from datetime import datetime
 from utils.lock_decorator import require_write_access, require_read_access, bypass_lock_check
 
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# ioctl FICLONE：在btrfs/xfs/apfs等支持CoW的文件系统上整文件克隆，
+# 只写元数据不搬字节
+_FICLONE = 0x40049409
+
+# 按设备号缓存的FICLONE支持情况（探测一次，进程内复用）
+_REFLINK_SUPPORT: Dict[int, bool] = {}
+
+
+def _probe_reflink(directory: Path) -> bool:
+    """在目标文件系统上试做一次FICLONE克隆，结果按st_dev缓存；
+    克隆不能跨挂载点，所以按目标目录所在设备探测"""
+    if fcntl is None:
+        return False
+    try:
+        dev = os.stat(directory).st_dev
+    except OSError:
+        return False
+    cached = _REFLINK_SUPPORT.get(dev)
+    if cached is not None:
+        return cached
+    probe_src = directory / f".reflink_probe_{os.getpid()}.src"
+    probe_dst = directory / f".reflink_probe_{os.getpid()}.dst"
+    supported = False
+    try:
+        probe_src.write_bytes(b"probe")
+        with open(probe_src, 'rb') as fsrc, open(probe_dst, 'wb') as fdst:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        supported = True
+    except OSError:
+        supported = False
+    finally:
+        for probe_file in (probe_src, probe_dst):
+            try:
+                probe_file.unlink()
+            except OSError:
+                pass
+    _REFLINK_SUPPORT[dev] = supported
+    return supported
+
+
+def _reflink_copy(src: str, dst: str, *, follow_symlinks: bool = True,
+                  try_ficlone: bool = True):
+    """复制单个文件，按代价从低到高依次尝试：
+    FICLONE整文件克隆（O(元数据)）→ copy_file_range（内核内拷贝，
+    省用户态往返）→ shutil.copy2"""
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            cloned = False
+            if try_ficlone and fcntl is not None:
+                try:
+                    fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+                    cloned = True
+                except OSError:
+                    pass
+            if not cloned:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+        shutil.copystat(src, dst, follow_symlinks=follow_symlinks)
+    except (AttributeError, OSError):
+        shutil.copy2(src, dst, follow_symlinks=follow_symlinks)
+
+
+def _hardlink_copy(src: str, dst: str, *, follow_symlinks: bool = True):
+    """硬链接复制：同文件系统内零字节移动（副本与源共享inode），
+    跨设备等失败时退回shutil.copy2"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst, follow_symlinks=follow_symlinks)
+
+
+# 工作区复制的底层文件复制方式
+_COPY_FUNCTIONS = {
+    "reflink": _reflink_copy,
+    "hardlink": _hardlink_copy,
+    "copy": shutil.copy2,
+}
+
+
+def _copy_tree(src: str, dst: str, copy_function):
+    """复制一棵任务目录树（在线程中执行，不阻塞事件循环）"""
+    shutil.copytree(src, dst, copy_function=copy_function)
+
+
+def _fast_rmtree(path: str):
+    """基于os.scandir的递归删除：DirEntry缓存了目录项类型，
+    比shutil.rmtree少一轮逐项stat"""
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                _fast_rmtree(entry.path)
+            else:
+                os.unlink(entry.path)
+    os.rmdir(path)
+
+
+def _safe_rmtree(tid: str, target_path: Path) -> Tuple[str, str, Path, Optional[str]]:
+    """删除单个任务目录（在线程中执行），返回(状态, taskid, 路径, 错误)"""
+    if not target_path.exists():
+        return ("missing", tid, target_path, None)
+    try:
+        if target_path.is_dir():
+            _fast_rmtree(str(target_path))
+        else:
+            # 若为文件（非预期），也尝试删除
+            os.remove(target_path)
+        return ("ok", tid, target_path, None)
+    except Exception as ex:
+        return ("error", tid, target_path, str(ex))
+
+
 class WorkspaceCopyTool(LocalTool):
     """工作区复制工具"""
     
@@ -24,6 +147,7 @@ class WorkspaceCopyTool(LocalTool):
         copyed_taskid: str,
         numV: int,
         copyid_list: List[str],
+        mode: str = "reflink",
         **kwargs
     ) -> ToolResponse:
         try:
@@ -42,6 +166,11 @@ class WorkspaceCopyTool(LocalTool):
             # 检查是否包含源ID
             if copyed_taskid in copyid_list:
                 return ToolResponse(success=False, error="copyid_list should not contain copyed_taskid")
+            if mode not in _COPY_FUNCTIONS:
+                return ToolResponse(
+                    success=False,
+                    error=f"mode must be one of {sorted(_COPY_FUNCTIONS)}, got: {mode}"
+                )
 
             tasks_root = workspace_path / "tasks"
             src_path = tasks_root / copyed_taskid
@@ -50,7 +179,14 @@ class WorkspaceCopyTool(LocalTool):
 
             tasks_root.mkdir(parents=True, exist_ok=True)
 
-            created: List[Dict[str, Any]] = []
+            copy_function = _COPY_FUNCTIONS[mode]
+            if mode == "reflink":
+                # 探测一次目标文件系统是否支持克隆（按设备缓存），
+                # 不支持就免去对每个文件的ioctl尝试；源和目标都在
+                # tasks_root下，同一挂载点，克隆不会跨设备
+                copy_function = partial(
+                    _reflink_copy, try_ficlone=_probe_reflink(tasks_root)
+                )
 
             # 预检查：任一目标已存在则整体失败，避免部分复制
             existing_targets = [tid for tid in copyid_list if (tasks_root / tid).exists()]
@@ -60,15 +196,26 @@ class WorkspaceCopyTool(LocalTool):
                     error=f"target task(s) already exist: {', '.join(existing_targets)}"
                 )
 
-            # 执行复制
-            for target_id in copyid_list:
-                dest_path = tasks_root / target_id
-                # 父目录已存在，copytree禁止覆盖，按预检查可安全复制
-                shutil.copytree(str(src_path), str(dest_path))
-                created.append({
-                    "task_id": target_id,
-                    "path": str(dest_path)
-                })
+            # 各副本互不依赖，放线程池并发复制，事件循环不被阻塞；
+            # 任一副本失败则清掉已产生的部分目录，保持全有或全无
+            try:
+                await asyncio.gather(*(
+                    asyncio.to_thread(
+                        _copy_tree, str(src_path), str(tasks_root / target_id), copy_function
+                    )
+                    for target_id in copyid_list
+                ))
+            except Exception:
+                for target_id in copyid_list:
+                    dest_path = tasks_root / target_id
+                    if dest_path.exists():
+                        shutil.rmtree(dest_path, ignore_errors=True)
+                raise
+
+            created = [
+                {"task_id": target_id, "path": str(tasks_root / target_id)}
+                for target_id in copyid_list
+            ]
 
             return ToolResponse(
                 success=True,
@@ -112,41 +259,37 @@ class WorkspaceDeleteTool(LocalTool):
             missing: List[str] = []
             errors: List[Dict[str, Any]] = []
 
-            for tid in taskid_list:
-                target_path = tasks_root / tid
-                if not target_path.exists():
-                    missing.append(tid)
-                    if stop_on_error:
-                        return ToolResponse(
-                            success=False,
-                            error=f"task not found: {tid}",
-                            data={
-                                "missing": missing,
-                                "deleted": deleted,
-                                "errors": errors,
-                            },
-                        )
-                    continue
-                try:
-                    if target_path.is_dir():
-                        shutil.rmtree(target_path)
-                    else:
-                        # 若为文件（非预期），也尝试删除
-                        os.remove(target_path)
+            # 各目录删除互不依赖，放线程池并发执行，事件循环不被大目录卡住
+            results = await asyncio.gather(*(
+                asyncio.to_thread(_safe_rmtree, tid, tasks_root / tid)
+                for tid in taskid_list
+            ))
+
+            first_problem: Optional[str] = None
+            for status, tid, target_path, err in results:
+                if status == "ok":
                     deleted.append({"task_id": tid, "path": str(target_path)})
-                except Exception as ex:
-                    err = {"task_id": tid, "path": str(target_path), "error": str(ex)}
-                    errors.append(err)
-                    if stop_on_error:
-                        return ToolResponse(
-                            success=False,
-                            error=f"failed to delete: {tid}",
-                            data={
-                                "missing": missing,
-                                "deleted": deleted,
-                                "errors": errors,
-                            },
-                        )
+                elif status == "missing":
+                    missing.append(tid)
+                    if first_problem is None:
+                        first_problem = f"task not found: {tid}"
+                else:
+                    errors.append({"task_id": tid, "path": str(target_path), "error": err})
+                    if first_problem is None:
+                        first_problem = f"failed to delete: {tid}"
+
+            # 删除已并发发出，stop_on_error不再中途截断，
+            # 但语义保持：出现任何缺失/失败即整体报错
+            if stop_on_error and first_problem is not None:
+                return ToolResponse(
+                    success=False,
+                    error=first_problem,
+                    data={
+                        "missing": missing,
+                        "deleted": deleted,
+                        "errors": errors,
+                    },
+                )
 
             success = len(errors) == 0 and True
             return ToolResponse(
@@ -1,10 +1,11 @@
 import json
 import asyncio
+import sqlite3
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Any, Tuple
+from dataclasses import dataclass
 from threading import Lock
 from utils.logger import global_logger
 
@@ -19,133 +20,232 @@ class HumanTask:
     created_at: str = None
     completed_at: Optional[str] = None
     result: Optional[str] = None
-    
+
     def __post_init__(self):
         if self.created_at is None:
             self.created_at = datetime.now().isoformat()
 
 
 class HumanTaskManager:
-    """人类任务管理器 - 线程安全的任务存储和状态管理"""
-    
+    """人类任务管理器 - 线程安全的任务存储和状态管理
+
+    存储用SQLite（WAL模式）：创建/更新只写一行，查询走索引，
+    不再像JSON文件那样每次操作都整读整写；轮询读不阻塞写。
+    """
+
     def __init__(self, workspace_path: Path):
         self.workspace_path = workspace_path
+        self.db_file = workspace_path / "human_tasks.db"
+        # 旧版JSON存储文件，首次启动时迁移其内容
         self.human_tasks_file = workspace_path / "human_tasks.json"
         self._lock = Lock()
-        self._ensure_file_exists()
-    
-    def _ensure_file_exists(self):
-        """确保人类任务文件存在"""
+        # 等待者注册表：human_task_id -> (事件循环, Event)，
+        # 完成时即时唤醒对应的wait_for_completion
+        self._waiters: Dict[str, Tuple[Any, asyncio.Event]] = {}
+        self._conn = sqlite3.connect(
+            str(self.db_file), isolation_level=None, check_same_thread=False
+        )
+        self._init_db()
+        self._migrate_from_json()
+
+    def _init_db(self):
+        """初始化表结构与WAL模式"""
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS human_tasks(
+                human_task_id TEXT PRIMARY KEY,
+                task_id TEXT NOT NULL,
+                human_task TEXT NOT NULL,
+                completed INTEGER NOT NULL DEFAULT 0,
+                created_at TEXT,
+                completed_at TEXT,
+                result TEXT
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_human_tasks_task_id ON human_tasks(task_id)"
+        )
+
+    def _migrate_from_json(self):
+        """把旧版human_tasks.json的内容一次性导入数据库"""
         if not self.human_tasks_file.exists():
-            with open(self.human_tasks_file, 'w', encoding='utf-8') as f:
-                json.dump({}, f, ensure_ascii=False, indent=2)
-    
-    def _load_tasks(self) -> Dict[str, Dict[str, Any]]:
-        """加载所有任务"""
+            return
         try:
             with open(self.human_tasks_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            global_logger.error(f"Failed to load human tasks: {str(e)}")
-            return {}
-    
-    def _save_tasks(self, tasks: Dict[str, Dict[str, Any]]):
-        """保存任务到文件"""
-        try:
-            with open(self.human_tasks_file, 'w', encoding='utf-8') as f:
-                json.dump(tasks, f, ensure_ascii=False, indent=2)
+                tasks = json.load(f)
+            with self._lock:
+                for task_human_tasks in tasks.values():
+                    for task_data in task_human_tasks.values():
+                        self._conn.execute(
+                            "INSERT OR IGNORE INTO human_tasks"
+                            "(human_task_id, task_id, human_task, completed,"
+                            " created_at, completed_at, result)"
+                            " VALUES(?, ?, ?, ?, ?, ?, ?)",
+                            (
+                                task_data.get('human_task_id'),
+                                task_data.get('task_id'),
+                                task_data.get('human_task'),
+                                1 if task_data.get('completed') else 0,
+                                task_data.get('created_at'),
+                                task_data.get('completed_at'),
+                                task_data.get('result'),
+                            )
+                        )
+            # 迁移完成后改名留档，避免重复导入
+            self.human_tasks_file.rename(
+                self.human_tasks_file.with_suffix('.json.migrated')
+            )
+            global_logger.info("Migrated human tasks from JSON to SQLite")
         except Exception as e:
-            global_logger.error(f"Failed to save human tasks: {str(e)}")
-            raise
-    
+            global_logger.error(f"Failed to migrate human tasks from JSON: {str(e)}")
+
+    @staticmethod
+    def _row_to_task(row) -> HumanTask:
+        """把数据库行转成HumanTask"""
+        return HumanTask(
+            human_task_id=row[0],
+            task_id=row[1],
+            human_task=row[2],
+            completed=bool(row[3]),
+            created_at=row[4],
+            completed_at=row[5],
+            result=row[6],
+        )
+
     def create_human_task(self, task_id: str, human_task: str) -> str:
-        """创建新的人类任务"""
-        human_task_id = str(uuid.uuid4())
-        
+        """创建新的人类任务（单行INSERT）"""
+        human_task_obj = HumanTask(
+            human_task_id=str(uuid.uuid4()),
+            task_id=task_id,
+            human_task=human_task
+        )
+
         with self._lock:
-            tasks = self._load_tasks()
-            
-            # 确保 task_id 键存在
-            if task_id not in tasks:
-                tasks[task_id] = {}
-            
-            # 创建人类任务
-            human_task_obj = HumanTask(
-                human_task_id=human_task_id,
-                task_id=task_id,
-                human_task=human_task
+            self._conn.execute(
+                "INSERT INTO human_tasks"
+                "(human_task_id, task_id, human_task, completed,"
+                " created_at, completed_at, result)"
+                " VALUES(?, ?, ?, 0, ?, NULL, NULL)",
+                (
+                    human_task_obj.human_task_id,
+                    task_id,
+                    human_task,
+                    human_task_obj.created_at,
+                )
             )
-            
-            tasks[task_id][human_task_id] = asdict(human_task_obj)
-            self._save_tasks(tasks)
-            
-            global_logger.info(f"Created human task {human_task_id} for task {task_id}")
-            return human_task_id
-    
+
+        global_logger.info(f"Created human task {human_task_obj.human_task_id} for task {task_id}")
+        return human_task_obj.human_task_id
+
     def get_human_tasks(self, task_id: str) -> List[HumanTask]:
-        """获取指定任务下的所有人类任务"""
+        """获取指定任务下的所有人类任务（索引查询）"""
         with self._lock:
-            tasks = self._load_tasks()
-            task_human_tasks = tasks.get(task_id, {})
-            
-            return [
-                HumanTask(**task_data) 
-                for task_data in task_human_tasks.values()
-            ]
-    
-    def update_human_task_status(self, task_id: str, human_task_id: str, 
+            rows = self._conn.execute(
+                "SELECT human_task_id, task_id, human_task, completed,"
+                " created_at, completed_at, result"
+                " FROM human_tasks WHERE task_id = ? ORDER BY created_at",
+                (task_id,)
+            ).fetchall()
+
+        return [self._row_to_task(row) for row in rows]
+
+    def update_human_task_status(self, task_id: str, human_task_id: str,
                                 completed: bool, result: Optional[str] = None) -> bool:
-        """更新人类任务状态"""
+        """更新人类任务状态（单行UPDATE）"""
         with self._lock:
-            tasks = self._load_tasks()
-            
-            if task_id not in tasks or human_task_id not in tasks[task_id]:
-                return False
-            
-            # 更新任务状态
-            tasks[task_id][human_task_id]['completed'] = completed
             if result is not None:
-                tasks[task_id][human_task_id]['result'] = result
-            
-            if completed:
-                tasks[task_id][human_task_id]['completed_at'] = datetime.now().isoformat()
-            
-            self._save_tasks(tasks)
-            
+                cursor = self._conn.execute(
+                    "UPDATE human_tasks SET completed = ?, result = ?,"
+                    " completed_at = CASE WHEN ? THEN ? ELSE completed_at END"
+                    " WHERE task_id = ? AND human_task_id = ?",
+                    (1 if completed else 0, result, 1 if completed else 0,
+                     datetime.now().isoformat(), task_id, human_task_id)
+                )
+            else:
+                cursor = self._conn.execute(
+                    "UPDATE human_tasks SET completed = ?,"
+                    " completed_at = CASE WHEN ? THEN ? ELSE completed_at END"
+                    " WHERE task_id = ? AND human_task_id = ?",
+                    (1 if completed else 0, 1 if completed else 0,
+                     datetime.now().isoformat(), task_id, human_task_id)
+                )
+
+            if cursor.rowcount == 0:
+                return False
+
             global_logger.info(f"Updated human task {human_task_id} status to {completed}")
-            return True
-    
+            waiter = self._waiters.get(human_task_id) if completed else None
+
+        # 锁外唤醒等待者：完成信号即时送达，不等下一轮轮询
+        if waiter is not None:
+            loop, event = waiter
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # 等待者所在的事件循环已关闭，靠轮询兜底
+                pass
+        return True
+
     def get_human_task(self, task_id: str, human_task_id: str) -> Optional[HumanTask]:
-        """获取特定的人类任务"""
+        """获取特定的人类任务（主键查询）"""
         with self._lock:
-            tasks = self._load_tasks()
-            
-            if task_id not in tasks or human_task_id not in tasks[task_id]:
-                return None
-            
-            return HumanTask(**tasks[task_id][human_task_id])
-    
-    async def wait_for_completion(self, task_id: str, human_task_id: str, 
-                                 timeout: Optional[float] = None, 
+            row = self._conn.execute(
+                "SELECT human_task_id, task_id, human_task, completed,"
+                " created_at, completed_at, result"
+                " FROM human_tasks WHERE task_id = ? AND human_task_id = ?",
+                (task_id, human_task_id)
+            ).fetchone()
+
+        if row is None:
+            return None
+        return self._row_to_task(row)
+
+    def close(self):
+        """关闭数据库连接（服务停机时调用）"""
+        self._conn.close()
+
+    async def wait_for_completion(self, task_id: str, human_task_id: str,
+                                 timeout: Optional[float] = None,
                                  check_interval: float = 5.0) -> Optional[HumanTask]:
-        """等待人类任务完成"""
+        """等待人类任务完成
+
+        完成信号由update_human_task_status经asyncio.Event即时推送，
+        唤醒延迟毫秒级；check_interval仅作兜底轮询间隔（覆盖状态
+        被进程外直接改写等场景），等待期间不阻塞事件循环。
+        """
         start_time = datetime.now()
-        
-        while True:
-            human_task = self.get_human_task(task_id, human_task_id)
-            
-            if human_task is None:
-                global_logger.error(f"Human task {human_task_id} not found")
-                return None
-            
-            if human_task.completed:
-                global_logger.info(f"Human task {human_task_id} completed")
-                return human_task
-            
-            # 检查超时
-            if timeout and (datetime.now() - start_time).total_seconds() > timeout:
-                global_logger.warning(f"Human task {human_task_id} timed out")
-                return None
-            
-            # 等待下次检查
-            await asyncio.sleep(check_interval) 
\ No newline at end of file
+        event = asyncio.Event()
+        with self._lock:
+            self._waiters[human_task_id] = (asyncio.get_running_loop(), event)
+
+        try:
+            while True:
+                human_task = await asyncio.to_thread(self.get_human_task, task_id, human_task_id)
+
+                if human_task is None:
+                    global_logger.error(f"Human task {human_task_id} not found")
+                    return None
+
+                if human_task.completed:
+                    global_logger.info(f"Human task {human_task_id} completed")
+                    return human_task
+
+                # 检查超时
+                elapsed = (datetime.now() - start_time).total_seconds()
+                if timeout and elapsed > timeout:
+                    global_logger.warning(f"Human task {human_task_id} timed out")
+                    return None
+
+                # 等完成信号，最多等一个兜底轮询间隔
+                wait_time = check_interval
+                if timeout:
+                    wait_time = min(wait_time, max(timeout - elapsed, 0.01))
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=wait_time)
+                except asyncio.TimeoutError:
+                    pass
+                event.clear()
+        finally:
+            with self._lock:
+                self._waiters.pop(human_task_id, None)
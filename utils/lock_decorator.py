@@ -1,65 +1,110 @@
 import functools
+from datetime import datetime
 from typing import Callable, Any
 from utils.response import ToolResponse
 from utils.logger import global_logger
+from utils import lock_manager as _lock_manager_module
+
+# pydantic v2用model_construct跳过字段校验（拒绝路径字段固定且可信），
+# v1退回construct
+_construct_response = getattr(ToolResponse, 'model_construct', None) or ToolResponse.construct
+
+
+def _build_deny_response(file_path: str, lock_info, tool_name: str) -> ToolResponse:
+    """构造拒绝访问响应：跳过pydantic校验，少付热路径上的模型开销"""
+    global_logger.warning(
+        "文件访问被拒绝: %s - 锁定者: %s, 等级: %s, 工具: %s",
+        file_path, lock_info.locker_name, lock_info.level, tool_name
+    )
+    return _construct_response(
+        success=False,
+        error=f"文件访问被拒绝: {file_path} - 文件已被锁定 "
+              f"(锁定者: {lock_info.locker_name}, 等级: {lock_info.level})",
+        data={
+            "locked_file": file_path,
+            "lock_info": {
+                "locker_name": lock_info.locker_name,
+                "level": lock_info.level,
+                "locked_path": lock_info.path,
+                "task_id": lock_info.task_id
+            }
+        },
+        timestamp=datetime.now()
+    )
 
 def require_file_access(*file_path_params):
     """
     文件访问权限装饰器
-    
+
     Args:
         *file_path_params: 参数名列表，指定哪些参数包含文件路径
                           如果为空，默认检查 'file_path' 参数
     """
     if not file_path_params:
         file_path_params = ('file_path',)
-    
+
     def decorator(func: Callable) -> Callable:
+        # 绝大多数调用点只声明一个路径参数：给单参数情形生成
+        # 特化wrapper，省掉元组循环和逐项in检查
+        if len(file_path_params) == 1:
+            single_param = file_path_params[0]
+
+            @functools.wraps(func)
+            async def wrapper(self, task_id: str, **params) -> Any:
+                # 直接读模块全局拿LockManager实例：set_global_lock_manager
+                # 更新的就是这个引用，省掉每次调用的函数调用开销。
+                # 无锁管理器或无可检查参数时直接放行，不进入try块
+                lock_manager = _lock_manager_module._global_lock_manager
+                if lock_manager is None:
+                    return await func(self, task_id, **params)
+
+                file_path = params.get(single_param)
+                if not file_path or file_path.isspace():  # 只检查非空且非空白的路径
+                    return await func(self, task_id, **params)
+
+                # try只包住锁检查本身：工具自身的异常不在此捕获，
+                # 也不会在except分支里二次执行原函数
+                try:
+                    can_access, lock_info = lock_manager.check_access(file_path, task_id)
+
+                    if not can_access:
+                        return _build_deny_response(file_path, lock_info, self.tool_name)
+
+                except Exception as e:
+                    global_logger.error("锁检查装饰器异常: %s", e)
+                    # 锁检查失败时降级放行
+
+                return await func(self, task_id, **params)
+
+            return wrapper
+
         @functools.wraps(func)
         async def wrapper(self, task_id: str, **params) -> Any:
+            # 无锁管理器或调用未带任何路径参数时直接放行，不进入try块
+            lock_manager = _lock_manager_module._global_lock_manager
+            if lock_manager is None or not params:
+                return await func(self, task_id, **params)
+
+            # try只包住锁检查本身：工具自身的异常不在此捕获，
+            # 也不会在except分支里二次执行原函数
             try:
-                # 获取LockManager实例
-                from utils.lock_manager import get_global_lock_manager
-                lock_manager = get_global_lock_manager()
-                if lock_manager is None:
-                    # 如果没有锁管理器，直接执行原函数
-                    return await func(self, task_id, **params)
-                
                 # 检查所有指定的文件路径参数
                 for param_name in file_path_params:
                     if param_name in params:
                         file_path = params[param_name]
-                        if file_path and file_path.strip():  # 只检查非空且非空白的路径
+                        if file_path and not file_path.isspace():  # 只检查非空且非空白的路径
                             can_access, lock_info = lock_manager.check_access(file_path, task_id)
-                            
+
                             if not can_access:
-                                global_logger.warning(
-                                    f"文件访问被拒绝: {file_path} - 锁定者: {lock_info.locker_name}, "
-                                    f"等级: {lock_info.level}, 工具: {self.tool_name}"
-                                )
-                                return ToolResponse(
-                                    success=False,
-                                    message=f"文件访问被拒绝: {file_path} - 文件已被锁定 "
-                                           f"(锁定者: {lock_info.locker_name}, 等级: {lock_info.level})",
-                                    data={
-                                        "locked_file": file_path,
-                                        "lock_info": {
-                                            "locker_name": lock_info.locker_name,
-                                            "level": lock_info.level,
-                                            "locked_path": lock_info.path,
-                                            "task_id": lock_info.task_id
-                                        }
-                                    }
-                                )
-                
-                # 如果所有文件都可以访问，执行原函数
-                return await func(self, task_id, **params)
-                
+                                return _build_deny_response(file_path, lock_info, self.tool_name)
+
             except Exception as e:
-                global_logger.error(f"锁检查装饰器异常: {e}")
-                # 发生异常时，继续执行原函数（降级处理）
-                return await func(self, task_id, **params)
-        
+                global_logger.error("锁检查装饰器异常: %s", e)
+                # 锁检查失败时降级放行
+
+            # 所有文件都可以访问（或检查降级）时执行原函数
+            return await func(self, task_id, **params)
+
         return wrapper
     return decorator
 
@@ -83,4 +128,4 @@ def require_read_access(*file_path_params):
     读取访问权限装饰器
     目前与require_file_access相同，但可以在未来扩展为不同的权限检查
     """
-    return require_file_access(*file_path_params) 
\ No newline at end of file
+    return require_file_access(*file_path_params)
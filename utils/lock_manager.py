@@ -1,9 +1,13 @@
 import json
 import os
 import time
+import pickle
+import asyncio
+from collections import defaultdict
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass
 from utils.logger import global_logger
 
 # 全局锁管理器实例
@@ -18,9 +22,33 @@ def get_global_lock_manager():
     """获取全局锁管理器实例"""
     return _global_lock_manager
 
-@dataclass
+@lru_cache(maxsize=4096)
+def _normalize_path_cached(workspace_str: str, task_id: str, file_path: str) -> str:
+    """标准化路径：相对路径落到任务目录下，存储为相对workspace的路径。
+
+    每次访问检查都要做这套Path运算，而结果只取决于三个入参，
+    用lru_cache让同一文件的重复访问直接命中。"""
+    workspace_path = Path(workspace_str)
+    task_path = workspace_path / "tasks" / task_id
+
+    # 如果是相对路径，相对于任务目录
+    if not os.path.isabs(file_path):
+        full_path = task_path / file_path
+    else:
+        full_path = Path(file_path)
+
+    # 转换为相对于workspace的路径进行存储
+    try:
+        relative_path = full_path.relative_to(workspace_path)
+        return str(relative_path)
+    except ValueError:
+        # 如果路径不在workspace内，使用绝对路径
+        return str(full_path.absolute())
+
+
+@dataclass(slots=True)
 class FileLock:
-    """文件锁数据类"""
+    """文件锁数据类（slots省掉每实例__dict__，锁多时省内存且取属性更快）"""
     path: str
     level: int
     locker_name: str
@@ -28,70 +56,168 @@ class FileLock:
     task_id: str
     
     def to_dict(self) -> Dict:
-        """转换为字典"""
-        return asdict(self)
+        """转换为字典（直接字面量，绕开asdict内部的deepcopy）"""
+        return {
+            'path': self.path,
+            'level': self.level,
+            'locker_name': self.locker_name,
+            'locked_at': self.locked_at,
+            'task_id': self.task_id,
+        }
     
     @classmethod
     def from_dict(cls, data: Dict) -> 'FileLock':
         """从字典创建"""
         return cls(**data)
 
+class _TrieNode:
+    """路径前缀树节点：children按路径段索引，锁挂在对应路径的节点上"""
+    __slots__ = ('children', 'lock')
+
+    def __init__(self):
+        self.children: Dict[str, '_TrieNode'] = {}
+        self.lock: Optional[FileLock] = None
+
+
 class LockManager:
     """文件锁管理器"""
-    
+
     def __init__(self, workspace_path: Path):
         self.workspace_path = workspace_path
-        self.locks_file = workspace_path / "locks.json"
+        # 锁文件是纯机器消费的，用pickle二进制存储（比JSON更快更小）；
+        # 旧版locks.json首次加载时一次性迁移
+        self.locks_file = workspace_path / "locks.pkl"
+        self.legacy_locks_file = workspace_path / "locks.json"
         self._locks: Dict[str, FileLock] = {}
+        # 锁的前缀树视图：父/子锁检查走一次指针遍历，
+        # 不再为每级祖先拼接路径字符串做dict查找
+        self._root = _TrieNode()
+        # 按任务的二级索引：清理/按任务列举只看该任务自己的锁
+        self._locks_by_task: Dict[str, Set[str]] = defaultdict(set)
+        # 延迟写盘状态：窗口内的多次锁变更合并成一次写
+        self._dirty = False
+        self._save_handle = None
+        self._save_delay = 0.2
         self._load_locks()
-    
+
+    @staticmethod
+    def _serialize(data: Dict[str, Dict]) -> bytes:
+        """序列化锁快照（pickle协议5，机器消费专用）"""
+        return pickle.dumps(data, protocol=5)
+
+    @staticmethod
+    def _deserialize(raw: bytes) -> Dict[str, Dict]:
+        """反序列化锁快照"""
+        return pickle.loads(raw)
+
     def _load_locks(self):
-        """加载锁信息"""
+        """加载锁信息（优先读二进制文件，旧版JSON一次性迁移）"""
         try:
+            data = None
             if self.locks_file.exists():
-                with open(self.locks_file, 'r', encoding='utf-8') as f:
+                with open(self.locks_file, 'rb') as f:
+                    data = self._deserialize(f.read())
+            elif self.legacy_locks_file.exists():
+                # 迁移旧版locks.json：读取后改写为二进制格式并改名归档
+                with open(self.legacy_locks_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
-                    self._locks = {
-                        path: FileLock.from_dict(lock_data) 
-                        for path, lock_data in data.items()
-                    }
-                global_logger.info(f"已加载 {len(self._locks)} 个文件锁")
+                self._write_locks(data)
+                self.legacy_locks_file.rename(
+                    self.legacy_locks_file.with_suffix('.json.migrated')
+                )
+                global_logger.info("已迁移旧版locks.json到二进制格式")
+            if data is not None:
+                self._locks = {
+                    path: FileLock.from_dict(lock_data)
+                    for path, lock_data in data.items()
+                }
+                for path, lock in self._locks.items():
+                    self._trie_insert(path, lock)
+                    self._locks_by_task[lock.task_id].add(path)
+                global_logger.info("已加载 %d 个文件锁", len(self._locks))
         except Exception as e:
-            global_logger.error(f"加载锁信息失败: {e}")
+            global_logger.error("加载锁信息失败: %s", e)
             self._locks = {}
+            self._root = _TrieNode()
+
+    @staticmethod
+    def _split_segments(norm_path: str) -> List[str]:
+        """把标准化路径拆成路径段（过滤绝对路径开头的空段）"""
+        return [seg for seg in norm_path.split(os.sep) if seg]
+
+    def _trie_insert(self, norm_path: str, lock: FileLock):
+        """把锁挂到前缀树对应节点"""
+        node = self._root
+        for seg in self._split_segments(norm_path):
+            node = node.children.setdefault(seg, _TrieNode())
+        node.lock = lock
+
+    def _trie_remove(self, norm_path: str):
+        """从前缀树摘除锁并剪掉空分支"""
+        node = self._root
+        trail = []
+        for seg in self._split_segments(norm_path):
+            child = node.children.get(seg)
+            if child is None:
+                return
+            trail.append((node, seg))
+            node = child
+        node.lock = None
+        for parent, seg in reversed(trail):
+            child = parent.children[seg]
+            if child.lock is None and not child.children:
+                del parent.children[seg]
+            else:
+                break
     
     def _save_locks(self):
-        """保存锁信息"""
+        """调度保存：约200ms窗口内的连续锁变更合并成一次写盘，
+        实际写入放线程池，异步工具调用不再被磁盘I/O卡住"""
+        self._dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # 没有运行中的事件循环（同步上下文），直接落盘
+            self.flush_now()
+            return
+        if self._save_handle is None:
+            self._save_handle = loop.call_later(self._save_delay, self._flush_later, loop)
+
+    def _flush_later(self, loop):
+        """延迟窗口到期后把当前快照交给线程池写盘"""
+        self._save_handle = None
+        if not self._dirty:
+            return
+        self._dirty = False
+        snapshot = {path: lock.to_dict() for path, lock in self._locks.items()}
+        asyncio.ensure_future(asyncio.to_thread(self._write_locks, snapshot), loop=loop)
+
+    def flush_now(self):
+        """同步落盘（停机或无事件循环时调用，保证持久化）"""
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+        self._dirty = False
+        self._write_locks({path: lock.to_dict() for path, lock in self._locks.items()})
+
+    def _write_locks(self, data: Dict[str, Dict]):
+        """把锁快照原子写入locks.pkl（tmp + os.replace）"""
         try:
             # 确保目录存在
             self.locks_file.parent.mkdir(parents=True, exist_ok=True)
-            
-            data = {path: lock.to_dict() for path, lock in self._locks.items()}
-            with open(self.locks_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            global_logger.info(f"已保存 {len(self._locks)} 个文件锁")
+
+            tmp_file = self.locks_file.with_suffix('.pkl.tmp')
+            with open(tmp_file, 'wb') as f:
+                f.write(self._serialize(data))
+            os.replace(tmp_file, self.locks_file)
+            global_logger.info("已保存 %d 个文件锁", len(data))
         except Exception as e:
-            global_logger.error(f"保存锁信息失败: {e}")
+            global_logger.error("保存锁信息失败: %s", e)
     
     def _normalize_path(self, file_path: str, task_id: str) -> str:
-        """标准化路径"""
-        # 获取任务路径
-        task_path = self.workspace_path / "tasks" / task_id
-        
-        # 如果是相对路径，相对于任务目录
-        if not os.path.isabs(file_path):
-            full_path = task_path / file_path
-        else:
-            full_path = Path(file_path)
-        
-        # 转换为相对于workspace的路径进行存储
-        try:
-            relative_path = full_path.relative_to(self.workspace_path)
-            return str(relative_path)
-        except ValueError:
-            # 如果路径不在workspace内，使用绝对路径
-            return str(full_path.absolute())
-    
+        """标准化路径（纯函数，结果按(workspace, task, path)记忆化）"""
+        return _normalize_path_cached(str(self.workspace_path), task_id, file_path)
+
     def lock_file(self, file_path: str, level: int, locker_name: str, task_id: str) -> Tuple[bool, str]:
         """
         锁定文件或目录
@@ -133,9 +259,11 @@ class LockManager:
         )
         
         self._locks[norm_path] = lock
+        self._trie_insert(norm_path, lock)
+        self._locks_by_task[task_id].add(norm_path)
         self._save_locks()
         
-        global_logger.info(f"文件已锁定: {norm_path} by {locker_name} (level {level})")
+        global_logger.info("文件已锁定: %s by %s (level %s)", norm_path, locker_name, level)
         return True, f"成功锁定文件: {norm_path}"
     
     def unlock_file(self, file_path: str, unlocker_name: str, unlocker_level: int, task_id: str) -> Tuple[bool, str]:
@@ -161,15 +289,19 @@ class LockManager:
         # 高等级可以无条件解锁低等级
         if unlocker_level > lock.level:
             del self._locks[norm_path]
+            self._trie_remove(norm_path)
+            self._locks_by_task[lock.task_id].discard(norm_path)
             self._save_locks()
-            global_logger.info(f"高等级解锁: {norm_path} by {unlocker_name} (level {unlocker_level} > {lock.level})")
+            global_logger.info("高等级解锁: %s by %s (level %s > %s)", norm_path, unlocker_name, unlocker_level, lock.level)
             return True, f"成功解锁文件: {norm_path} (高等级解锁)"
         
         # 同等级或低等级需要验证名称
         if unlocker_name == lock.locker_name:
             del self._locks[norm_path]
+            self._trie_remove(norm_path)
+            self._locks_by_task[lock.task_id].discard(norm_path)
             self._save_locks()
-            global_logger.info(f"名称匹配解锁: {norm_path} by {unlocker_name}")
+            global_logger.info("名称匹配解锁: %s by %s", norm_path, unlocker_name)
             return True, f"成功解锁文件: {norm_path} (名称匹配)"
         
         return False, f"解锁失败: 权限不足或名称不匹配 (需要等级 > {lock.level} 或名称 = '{lock.locker_name}')"
@@ -181,45 +313,52 @@ class LockManager:
         Returns:
             (可访问标志, 锁信息)
         """
+        # 最常见的状态是一个锁都没有：一次空判定直接放行，
+        # 连路径标准化都不用做
+        if not self._locks:
+            return True, None
+
         norm_path = self._normalize_path(file_path, task_id)
-        
-        # 检查直接锁定
-        if norm_path in self._locks:
-            return False, self._locks[norm_path]
-        
-        # 检查父目录锁定
-        parent_lock = self._find_parent_lock(norm_path)
-        if parent_lock:
-            return False, parent_lock
-        
+
+        # 一次前缀树遍历同时覆盖祖先锁和直接锁：
+        # 路过的任一节点（含终点自身）挂了锁就拒绝
+        node = self._root
+        for seg in self._split_segments(norm_path):
+            node = node.children.get(seg)
+            if node is None:
+                return True, None
+            if node.lock is not None:
+                return False, node.lock
+
         return True, None
     
     def _find_parent_lock(self, file_path: str) -> Optional[FileLock]:
-        """查找父目录锁"""
-        path_parts = Path(file_path).parts
-        
-        for i in range(len(path_parts) - 1, 0, -1):
-            parent_path = str(Path(*path_parts[:i]))
-            if parent_path in self._locks:
-                return self._locks[parent_path]
-        
+        """查找祖先目录锁：沿前缀树走一遍，遇到的第一个锁即返回"""
+        segments = self._split_segments(file_path)
+        node = self._root
+        for seg in segments[:-1]:
+            node = node.children.get(seg)
+            if node is None:
+                return None
+            if node.lock is not None:
+                return node.lock
         return None
-    
+
     def _find_child_locks(self, dir_path: str) -> List[FileLock]:
-        """查找子路径锁"""
+        """查找子路径锁：从目标节点DFS子树，不再扫描全部锁"""
+        node = self._root
+        for seg in self._split_segments(dir_path):
+            node = node.children.get(seg)
+            if node is None:
+                return []
+
         child_locks = []
-        dir_path_obj = Path(dir_path)
-        
-        for locked_path, lock in self._locks.items():
-            locked_path_obj = Path(locked_path)
-            try:
-                # 检查是否是子路径
-                locked_path_obj.relative_to(dir_path_obj)
-                child_locks.append(lock)
-            except ValueError:
-                # 不是子路径
-                continue
-        
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current.lock is not None:
+                child_locks.append(current.lock)
+            stack.extend(current.children.values())
         return child_locks
     
     def list_locks(self, task_id: Optional[str] = None) -> List[FileLock]:
@@ -233,7 +372,8 @@ class LockManager:
             锁列表
         """
         if task_id:
-            return [lock for lock in self._locks.values() if lock.task_id == task_id]
+            # 走按任务索引，代价只与该任务自己的锁数相关
+            return [self._locks[path] for path in self._locks_by_task.get(task_id, ())]
         return list(self._locks.values())
     
     def get_lock_info(self, file_path: str, task_id: str) -> Optional[FileLock]:
@@ -242,20 +382,16 @@ class LockManager:
         return self._locks.get(norm_path)
     
     def clear_task_locks(self, task_id: str) -> int:
-        """清理特定任务的所有锁"""
+        """清理特定任务的所有锁（只遍历该任务的索引，不扫全部锁）"""
         removed_count = 0
-        paths_to_remove = []
-        
-        for path, lock in self._locks.items():
-            if lock.task_id == task_id:
-                paths_to_remove.append(path)
-        
-        for path in paths_to_remove:
+
+        for path in self._locks_by_task.pop(task_id, set()):
             del self._locks[path]
+            self._trie_remove(path)
             removed_count += 1
         
         if removed_count > 0:
             self._save_locks()
-            global_logger.info(f"已清理任务 {task_id} 的 {removed_count} 个锁")
+            global_logger.info("已清理任务 %s 的 %d 个锁", task_id, removed_count)
         
         return removed_count 
\ No newline at end of file
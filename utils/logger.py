@@ -1,76 +1,168 @@
+import atexit
 import logging
 import os
+import reprlib
+import threading
+import time
+from logging.handlers import MemoryHandler
 from datetime import datetime
 from typing import Optional, Dict, Any
 
+# 摘要用的有界repr：逐项截断，大结果（如文件内容）不会先整体
+# 字符串化再截断
+_SUMMARY_REPR = reprlib.Repr()
+_SUMMARY_REPR.maxstring = 100
+_SUMMARY_REPR.maxdict = 8
+_SUMMARY_REPR.maxlist = 8
+_SUMMARY_REPR.maxother = 100
+
+# 共享的Formatter单例：所有任务的handler复用，不必每个实例各建两份
+_PROCESS_FORMATTER = logging.Formatter('%(asctime)s - %(message)s')
+_DETAIL_FORMATTER = logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+# TaskLogger实例缓存与已建目录记录
+_task_logger_cache: Dict[str, "TaskLogger"] = {}
+_created_log_dirs = set()
+
+# 缓冲handler的周期flush：前端通过轮询读取日志文件实时跟踪任务，
+# 安静的任务不能等攒满capacity或出现ERROR才落盘
+_buffered_handlers: list = []
+_FLUSH_INTERVAL = 1.0
+_flush_thread = None
+_flush_thread_lock = threading.Lock()
+
+
+def _flush_buffered_handlers_loop():
+    while True:
+        time.sleep(_FLUSH_INTERVAL)
+        for handler in list(_buffered_handlers):
+            try:
+                handler.flush()
+            except Exception:
+                pass
+
+
+def _register_buffered_handler(handler: MemoryHandler):
+    """登记缓冲handler并确保后台flush守护线程已启动"""
+    global _flush_thread
+    _buffered_handlers.append(handler)
+    atexit.register(handler.flush)
+    with _flush_thread_lock:
+        if _flush_thread is None:
+            _flush_thread = threading.Thread(
+                target=_flush_buffered_handlers_loop,
+                name="task-log-flush",
+                daemon=True
+            )
+            _flush_thread.start()
+
+
+def get_task_logger(task_id: str, log_dir: str) -> "TaskLogger":
+    """按task_id缓存的TaskLogger工厂：重复获取不再重建handler、
+    不再多开文件描述符"""
+    logger = _task_logger_cache.get(task_id)
+    if logger is None:
+        logger = TaskLogger(task_id, log_dir)
+        _task_logger_cache[task_id] = logger
+    return logger
+
+
+def drop_task_logger(task_id: str):
+    """任务删除时清理缓存的logger并关闭其handler释放文件描述符"""
+    task_logger = _task_logger_cache.pop(task_id, None)
+    if task_logger is None:
+        return
+    for logger in (task_logger.process_logger, task_logger.detail_logger):
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            try:
+                # MemoryHandler.close()会flush后把target置None，
+                # 先取引用；target的文件handler不挂在logger上，需一并关闭
+                target = getattr(handler, 'target', None)
+                handler.close()
+                if target is not None:
+                    target.close()
+                # 从周期flush名单摘除，避免守护线程碰已关闭的handler
+                try:
+                    _buffered_handlers.remove(handler)
+                except ValueError:
+                    pass
+            except Exception:
+                pass
+
 
 class TaskLogger:
     """任务级别的双层日志系统"""
-    
+
     def __init__(self, task_id: str, log_dir: str):
         self.task_id = task_id
         self.log_dir = log_dir
+        # 目录只建一次，后续实例化不再走makedirs系统调用
+        if log_dir not in _created_log_dirs:
+            os.makedirs(log_dir, exist_ok=True)
+            _created_log_dirs.add(log_dir)
         self.process_logger = self._setup_process_logger()
         self.detail_logger = self._setup_detail_logger()
-    
+
     def _setup_process_logger(self) -> logging.Logger:
         """设置进程日志（工具执行摘要）"""
         logger_name = f"task_{self.task_id}_process"
         logger = logging.getLogger(logger_name)
         logger.setLevel(logging.INFO)
-        
+
         # 避免重复添加handler
         if logger.handlers:
             return logger
-            
+
         # 创建日志文件
-        os.makedirs(self.log_dir, exist_ok=True)
         log_file = os.path.join(self.log_dir, f"{self.task_id}_process.log")
-        
-        # 文件handler
+
+        # 文件handler：套一层MemoryHandler缓冲，攒满64条、出现ERROR
+        # 或后台线程周期flush时落盘，减少高频工具调用的write()系统调用
         file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(logging.INFO)
-        
-        # 控制台handler
+        file_handler.setFormatter(_PROCESS_FORMATTER)
+        buffered_handler = MemoryHandler(
+            capacity=64, flushLevel=logging.ERROR, target=file_handler
+        )
+        buffered_handler.setLevel(logging.INFO)
+        _register_buffered_handler(buffered_handler)
+
+        # 控制台handler保持不缓冲，实时输出不受影响
         console_handler = logging.StreamHandler()
         console_handler.setLevel(logging.INFO)
-        
-        # 简洁格式化（只显示时间和消息）
-        formatter = logging.Formatter('%(asctime)s - %(message)s')
-        file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
-        
-        logger.addHandler(file_handler)
+        console_handler.setFormatter(_PROCESS_FORMATTER)
+
+        logger.addHandler(buffered_handler)
         logger.addHandler(console_handler)
-        
+
         return logger
-    
+
     def _setup_detail_logger(self) -> logging.Logger:
         """设置详细日志（完整的执行细节）"""
         logger_name = f"task_{self.task_id}_detail"
         logger = logging.getLogger(logger_name)
         logger.setLevel(logging.DEBUG)
-        
+
         # 避免重复添加handler
         if logger.handlers:
             return logger
-            
+
         # 创建详细日志文件
-        os.makedirs(self.log_dir, exist_ok=True)
         log_file = os.path.join(self.log_dir, f"{self.task_id}_detail.log")
-        
-        # 只写入文件，不输出到控制台
+
+        # 只写入文件，不输出到控制台；同样经MemoryHandler缓冲落盘
         file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(logging.DEBUG)
-        
-        # 详细格式化
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        file_handler.setFormatter(_DETAIL_FORMATTER)
+        buffered_handler = MemoryHandler(
+            capacity=64, flushLevel=logging.ERROR, target=file_handler
         )
-        file_handler.setFormatter(formatter)
-        
-        logger.addHandler(file_handler)
-        
+        buffered_handler.setLevel(logging.DEBUG)
+        _register_buffered_handler(buffered_handler)
+
+        logger.addHandler(buffered_handler)
+
         return logger
     
     def _format_params_summary(self, params: Dict[str, Any]) -> str:
@@ -80,66 +172,77 @@ class TaskLogger:
         
         if not filtered_params:
             return ""
-        
-        # 转换为字符串
-        params_str = str(filtered_params)
-        
+
+        # 有界repr：每个值先各自截断，总量与键数成正比而非负载大小
+        params_str = _SUMMARY_REPR.repr(filtered_params)
+
         # 如果超过100字符，截取前100字符
         if len(params_str) > 100:
             params_str = params_str[:100] + "..."
-        
+
         return f" | {params_str}"
     
     def _format_result_summary(self, result: Dict[str, Any]) -> str:
         """格式化结果摘要（限制长度）"""
         if not result:
             return ""
-        
-        result_str = str(result)
-        
+
+        # 有界repr：大结果不整体字符串化，逐项截断后再做长度限制
+        result_str = _SUMMARY_REPR.repr(result)
+
         # 如果超过200字符，取前100字符和后100字符
         if len(result_str) > 200:
             result_str = result_str[:100] + "..." + result_str[-100:]
-        
+
         return f" | {result_str}"
     
     def log_tool_start(self, tool_name: str, params: Dict[str, Any]):
         """记录工具开始执行"""
+        # 级别被关掉时完全跳过摘要构造
+        if not self.process_logger.isEnabledFor(logging.INFO):
+            return
         # 进程日志：包含参数摘要
         params_summary = self._format_params_summary(params)
-        self.process_logger.info(f"[START] {tool_name}{params_summary}")
+        self.process_logger.info("[START] %s%s", tool_name, params_summary)
         
         # 详细日志：完整记录
-        self.detail_logger.info(f"Tool {tool_name} started")
-        self.detail_logger.debug(f"Parameters: {params}")
+        self.detail_logger.info("Tool %s started", tool_name)
+        self.detail_logger.debug("Parameters: %s", params)
     
     def log_tool_success(self, tool_name: str, result: Dict[str, Any], execution_time: float, params: Dict[str, Any] = None, silent: bool = False):
         """记录工具执行成功"""
         # 检查是否为静默模式（主要针对前端日志查看请求）
         if silent or (params and params.get('silent', False)):
             # 静默模式：只记录简化日志
-            self.detail_logger.debug(f"Tool {tool_name} executed silently in {execution_time:.3f}s")
+            self.detail_logger.debug("Tool %s executed silently in %.3fs", tool_name, execution_time)
             return
-            
+
+        # 级别被关掉时完全跳过摘要构造
+        if not self.process_logger.isEnabledFor(logging.INFO):
+            return
+
         # 正常模式：进程日志包含参数和结果摘要
         params_summary = self._format_params_summary(params) if params else ""
         result_summary = self._format_result_summary(result)
-        self.process_logger.info(f"[SUCCESS] {tool_name} ({execution_time:.3f}s){params_summary}{result_summary}")
+        self.process_logger.info("[SUCCESS] %s (%.3fs)%s%s", tool_name, execution_time, params_summary, result_summary)
         
         # 详细日志：完整记录
-        self.detail_logger.info(f"Tool {tool_name} executed successfully in {execution_time:.3f}s")
-        self.detail_logger.debug(f"Result: {result}")
+        self.detail_logger.info("Tool %s executed successfully in %.3fs", tool_name, execution_time)
+        self.detail_logger.debug("Result: %s", result)
     
     def log_tool_error(self, tool_name: str, error: str, execution_time: float, params: Dict[str, Any] = None):
         """记录工具执行失败"""
+        # 级别被关掉时完全跳过摘要构造
+        if not self.process_logger.isEnabledFor(logging.ERROR):
+            return
         # 进程日志：包含参数摘要和错误信息
         params_summary = self._format_params_summary(params) if params else ""
         # 错误信息也限制长度
         error_summary = error if len(error) <= 100 else error[:100] + "..."
-        self.process_logger.error(f"[ERROR] {tool_name} ({execution_time:.3f}s){params_summary} | Error: {error_summary}")
+        self.process_logger.error("[ERROR] %s (%.3fs)%s | Error: %s", tool_name, execution_time, params_summary, error_summary)
         
         # 详细日志：完整记录
-        self.detail_logger.error(f"Tool {tool_name} failed after {execution_time:.3f}s: {error}")
+        self.detail_logger.error("Tool %s failed after %.3fs: %s", tool_name, execution_time, error)
     
     def log_detail(self, message: str, level: str = "info"):
         """记录详细信息（仅写入详细日志）"""
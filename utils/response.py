@@ -1,6 +1,6 @@
 from datetime import datetime
-from typing import Any, Optional, Dict
-from pydantic import BaseModel
+from typing import Any, Optional, Dict, List
+from pydantic import BaseModel, Field
 import time
 
 
@@ -9,16 +9,13 @@ class ToolResponse(BaseModel):
     success: bool
     data: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
-    timestamp: datetime = None
+    # default_factory走pydantic原生默认值路径，免掉自定义__init__的
+    # 每次构造开销
+    timestamp: datetime = Field(default_factory=datetime.now)
     execution_time: Optional[float] = None
     task_id: Optional[str] = None
     tool_name: Optional[str] = None
-    
-    def __init__(self, **data):
-        if 'timestamp' not in data:
-            data['timestamp'] = datetime.now()
-        super().__init__(**data)
-    
+
     def set_execution_time(self, start_time: float):
         """设置执行时间"""
         self.execution_time = time.time() - start_time
@@ -35,3 +32,8 @@ class ToolRequest(BaseModel):
     tool_name: str
     params: Dict[str, Any] = {}
     multimodal_inputs: Optional[Dict[str, Any]] = None
+
+
+class BatchToolRequest(BaseModel):
+    """批量工具请求：requests并发执行，结果按请求顺序返回"""
+    requests: List[ToolRequest] = []